@@ -0,0 +1,44 @@
+# Custom authentication backend for the 'app'.
+# Configured via AUTHENTICATION_BACKENDS in settings.py.
+
+import functools
+import logging
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _dummy_password_hash(algorithm):
+    """ A throwaway hash for the given hasher algorithm, computed once and reused for every unknown-user login. """
+    return make_password("dummy-password-for-timing-equalization", hasher=algorithm)
+
+
+class EmailBackend(ModelBackend):
+    """
+    ModelBackend variant for the email-based User model.
+
+    On an unknown email, Django's ModelBackend hashes the submitted password onto a fresh
+    throwaway User instance so the response time doesn't reveal whether the account exists.
+    This backend keeps that timing guarantee (one hash verification per miss) but verifies
+    against a cached dummy hash instead of building a User and generating a new salt each time.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Still pay for one hash so missing and existing accounts take the same time.
+            # Keyed on the default hasher's algorithm so a PASSWORD_HASHERS change gets a matching dummy.
+            check_password(password, _dummy_password_hash(get_hasher().algorithm))
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
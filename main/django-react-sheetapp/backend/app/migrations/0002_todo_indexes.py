@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['-created_at'], name='app_todo_created_25db78_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['creator', '-created_at'], name='app_todo_creator_953c5b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['source_page', 'is_personal'], name='app_todo_source__c49042_idx'),
+        ),
+    ]
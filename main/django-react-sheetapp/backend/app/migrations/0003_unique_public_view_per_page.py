@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:11
+
+from django.db import migrations, models
+
+
+def dedupe_public_view_permissions(apps, schema_editor):
+    """ Keep the earliest PUBLIC VIEW grant per page so the new unique constraint can be created. """
+    PagePermission = apps.get_model('app', 'PagePermission')
+    seen_pages = set()
+    duplicate_ids = []
+    for perm_id, page_id in PagePermission.objects.filter(
+        target_type='PUBLIC', level='VIEW'
+    ).order_by('page_id', 'granted_at', 'id').values_list('id', 'page_id'):
+        if page_id in seen_pages:
+            duplicate_ids.append(perm_id)
+        else:
+            seen_pages.add(page_id)
+    if duplicate_ids:
+        PagePermission.objects.filter(id__in=duplicate_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_todo_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_public_view_permissions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='pagepermission',
+            constraint=models.UniqueConstraint(condition=models.Q(('level', 'VIEW'), ('target_type', 'PUBLIC')), fields=('page',), name='unique_public_view_per_page'),
+        ),
+    ]
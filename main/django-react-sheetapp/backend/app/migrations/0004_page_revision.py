@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_unique_public_view_per_page'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='page',
+            name='revision',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Revision'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-15 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_page_revision'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pagepermission',
+            index=models.Index(fields=['target_type', 'target_user', 'level', 'page'], name='app_pageper_target__3220da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pagepermission',
+            index=models.Index(fields=['target_type', 'target_group', 'level', 'page'], name='app_pageper_target__58055c_idx'),
+        ),
+    ]
@@ -23,6 +23,9 @@ class Page(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Last Updated"))
+    # Monotonic counter bumped on every data save; clients echo it back as 'base_revision'
+    # so concurrent saves are detected optimistically instead of locking the page row.
+    revision = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Revision"))
     # Permissions are handled by the separate PagePermission model
 
     class Meta:
@@ -49,21 +52,31 @@ class Page(models.Model):
         """ String representation of the Page model. """
         return self.name
 
-    def setup_default_structure(self):
+    # Columns every new page starts with; order follows list position
+    DEFAULT_COLUMNS = (
+        {'name': _("Column A"), 'width': 150},
+        {'name': _("Column B"), 'width': 150},
+    )
+
+    def setup_default_structure(self, check_existing=True):
         """
-        Creates the default initial structure for a new page (e.g., two columns).
+        Creates the default initial structure for a new page (the DEFAULT_COLUMNS).
         Called typically after a new Page instance is created.
+
+        Args:
+            check_existing (bool): Skip creation if the page already has columns. Callers that
+                just created the page can pass False to save the existence query.
         """
         # Import models locally to avoid potential circular dependencies at module load time
         from .structure import Column, Row
         # from .data import Cell # Uncomment if creating default cells too
 
         # Check if columns already exist for this page to prevent duplication
-        if not self.columns.exists():
-            # Use bulk_create for efficiency if creating multiple objects
+        if not check_existing or not self.columns.exists():
+            # All columns in a single INSERT
             Column.objects.bulk_create([
-                Column(page=self, name=_("Column A"), order=1, width=150),
-                Column(page=self, name=_("Column B"), order=2, width=150)
+                Column(page=self, name=spec['name'], order=order, width=spec.get('width', 150))
+                for order, spec in enumerate(self.DEFAULT_COLUMNS, start=1)
             ])
             # Optionally create one default row as well
             # default_row = Row.objects.create(page=self, order=1)
@@ -135,10 +135,25 @@ class PagePermission(models.Model):
         verbose_name = _("Page Permission")
         verbose_name_plural = _("Page Permissions")
         ordering = ['page__name', 'level']
-        # Optional: Add DB constraints for target consistency if your DB supports them well
-        # constraints = [
-        #     models.CheckConstraint(...)
-        # ]
+        indexes = [
+            # "Pages this user/group can reach": the USER and GROUP legs of the page list UNION.
+            # Trailing page_id lets those legs (which select only page_id) use index-only scans.
+            models.Index(fields=['target_type', 'target_user', 'level', 'page']),
+            models.Index(fields=['target_type', 'target_group', 'level', 'page']),
+            # Page-first lookups (object permission checks) are served by the unique_together index.
+        ]
+        constraints = [
+            # unique_together can't stop duplicate PUBLIC rows (their NULL targets never compare equal),
+            # so enforce at most one PUBLIC VIEW grant per page. Page list queries filtering on
+            # PUBLIC + VIEW rely on this to skip DISTINCT.
+            models.UniqueConstraint(
+                fields=['page'],
+                condition=models.Q(target_type='PUBLIC', level='VIEW'),
+                name='unique_public_view_per_page',
+            ),
+            # Optional: Add DB constraints for target consistency if your DB supports them well
+            # models.CheckConstraint(...)
+        ]
 
     def __str__(self):
         """ String representation showing the permission details. """
@@ -1,11 +1,15 @@
-from django.db import models
+import logging
+from django.db import models, connections, router
 from django.conf import settings
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 import uuid # Use UUID for ToDo primary key
 from .page import Page # Import related Page model
 from .structure import Row # Import Row model to link status
 
+logger = logging.getLogger(__name__)
+
 class Todo(models.Model):
     """ Represents a ToDo list derived from a specific Page. """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -43,6 +47,14 @@ class Todo(models.Model):
         # Slug should be unique within the context of its source page
         unique_together = ('source_page', 'slug')
         ordering = ['-created_at']
+        indexes = [
+            # Matches the default ordering so paginated (LIMIT) list queries avoid a full sort
+            models.Index(fields=['-created_at']),
+            # "ToDos I created", newest first
+            models.Index(fields=['creator', '-created_at']),
+            # Non-personal ToDos on pages the user can view
+            models.Index(fields=['source_page', 'is_personal']),
+        ]
         verbose_name = _("ToDo List")
         verbose_name_plural = _("ToDo Lists")
 
@@ -72,19 +84,27 @@ class Todo(models.Model):
         present in the source page when the ToDo list is first created.
         Should be called typically right after the Todo instance is saved.
         """
-        # Check if statuses already exist to prevent duplication if called multiple times
-        if not self.statuses.exists():
-            # Get all rows belonging to the source page
-            source_rows = self.source_page.rows.all()
-            # Prepare status objects for bulk creation
-            statuses_to_create = [
-                TodoStatus(todo=self, row=row, status=TodoStatus.Status.NOT_STARTED)
-                for row in source_rows
-            ]
-            # Create all status objects in a single database query if any rows exist
-            if statuses_to_create:
-                TodoStatus.objects.bulk_create(statuses_to_create)
-                print(f"Initialized {len(statuses_to_create)} statuses for ToDo '{self.name}'") # Logging/Debug
+        # Single INSERT ... SELECT over the source page's rows: one round trip regardless of row count,
+        # and no Row instances are loaded into Python. The NOT EXISTS guard keeps repeated calls
+        # idempotent (rows that already have a status for this ToDo are skipped).
+        # Raw SQL bypasses the ORM's routing, so pick the write database the router would.
+        connection = connections[router.db_for_write(TodoStatus, instance=self)]
+        qn = connection.ops.quote_name
+        status_table, row_table = qn(TodoStatus._meta.db_table), qn(Row._meta.db_table)
+        sql = (
+            f"INSERT INTO {status_table} ({qn('todo_id')}, {qn('row_id')}, {qn('status')}, {qn('updated_at')}) "
+            f"SELECT %s, r.{qn('id')}, %s, %s FROM {row_table} r WHERE r.{qn('page_id')} = %s "
+            f"AND NOT EXISTS (SELECT 1 FROM {status_table} s WHERE s.{qn('todo_id')} = %s AND s.{qn('row_id')} = r.{qn('id')})"
+        )
+        # Convert values the same way the ORM would (UUIDs are char(32) on SQLite, native uuid on Postgres)
+        todo_id = Todo._meta.pk.get_db_prep_value(self.pk, connection)
+        page_id = Page._meta.pk.get_db_prep_value(self.source_page_id, connection)
+        now = TodoStatus._meta.get_field('updated_at').get_db_prep_value(timezone.now(), connection)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [todo_id, TodoStatus.Status.NOT_STARTED, now, page_id, todo_id])
+            created = cursor.rowcount
+        if created:
+            logger.debug(f"Initialized {created} statuses for ToDo '{self.name}'")
 
 
 class TodoStatus(models.Model):
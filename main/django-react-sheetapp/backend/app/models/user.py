@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
 
@@ -102,3 +103,13 @@ class User(AbstractUser):
     def get_short_name(self):
         """Return the short name for the user (usually first name)."""
         return self.first_name
+
+    @cached_property
+    def groups_cached(self):
+        """
+        IDs of the groups this user is a member of, fetched once per User instance.
+        request.user is loaded fresh for every request, so this acts as a per-request cache
+        shared by page queryset filtering and the permission checks.
+        `del user.groups_cached` after changing this user's memberships mid-request.
+        """
+        return list(self.member_of_groups.order_by().values_list('id', flat=True)) # IDs only; skip Group's default name ordering
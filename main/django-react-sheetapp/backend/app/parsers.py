@@ -0,0 +1,26 @@
+# Request body parsers.
+# orjson is optional: without it these parsers behave exactly like DRF's own.
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError: # Fall back to the stdlib-based JSONParser
+    orjson = None
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser that decodes with orjson when it is installed.
+    orjson is several times faster on the large column/row/cell payloads sent to the page
+    save endpoint. The decoded data is the same plain dicts/lists either way.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type=media_type, parser_context=parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -1,10 +1,24 @@
+from collections import defaultdict
+from django.db.models import Q
 from rest_framework import permissions
 from .models import PagePermission, Page, Group, Todo, User # Import User model
 
 import logging
 logger = logging.getLogger(__name__) # Use the logger configured in settings.py
 
-# --- Helper Function ---
+# Users with higher permission levels implicitly have lower levels.
+# Maps each required level to the set of granted levels that satisfy it.
+_SATISFYING_LEVELS = {
+    PagePermission.Level.VIEW: {PagePermission.Level.VIEW, PagePermission.Level.EDIT, PagePermission.Level.MANAGE},
+    PagePermission.Level.EDIT: {PagePermission.Level.EDIT, PagePermission.Level.MANAGE},
+    PagePermission.Level.MANAGE: {PagePermission.Level.MANAGE},
+}
+
+# Grant levels that allow viewing a page, in Level order (stable SQL for level__in filters).
+# Public so views filtering querysets share the hierarchy check_permission uses.
+VIEW_LEVELS = tuple(level for level in PagePermission.Level if level in _SATISFYING_LEVELS[PagePermission.Level.VIEW])
+
+# --- Helper Functions ---
 
 def check_permission(user, page, required_level):
     """
@@ -32,8 +46,9 @@ def check_permission(user, page, required_level):
 
     # 2. Handle Superuser and Page Owner
     # Ensure user is an instance of your User model if check_permission is called elsewhere
+    # Compare owner_id against user.pk so this fast path never issues a query.
     if isinstance(user, User):
-        if user.is_superuser or page.owner == user:
+        if user.is_superuser or page.owner_id == user.pk:
             # logger.debug(f"User '{user.email}' is owner/superuser for page '{page.slug}': Allowed all levels.")
             return True
     else:
@@ -42,16 +57,7 @@ def check_permission(user, page, required_level):
 
     # 3. Determine Allowed Permission Levels
     # Users with higher permission levels implicitly have lower levels.
-    allowed_levels = set()
-    if required_level == PagePermission.Level.MANAGE:
-        allowed_levels.add(PagePermission.Level.MANAGE)
-    if required_level == PagePermission.Level.EDIT: # Edit also requires Manage
-        allowed_levels.add(PagePermission.Level.EDIT)
-        allowed_levels.add(PagePermission.Level.MANAGE)
-    if required_level == PagePermission.Level.VIEW: # View requires Edit or Manage too
-        allowed_levels.add(PagePermission.Level.VIEW)
-        allowed_levels.add(PagePermission.Level.EDIT)
-        allowed_levels.add(PagePermission.Level.MANAGE)
+    allowed_levels = _SATISFYING_LEVELS.get(required_level, set())
 
     # 4. Check Direct User Permissions
     # Use values_list for efficiency if only existence is needed
@@ -66,8 +72,8 @@ def check_permission(user, page, required_level):
         return True
 
     # 5. Check Group Permissions
-    # Fetch user's group IDs efficiently
-    user_group_ids = list(user.member_of_groups.values_list('id', flat=True)) # Get list of group IDs
+    # User's group IDs, cached on the user instance for the rest of the request
+    user_group_ids = user.groups_cached
     if user_group_ids: # Only query if the user belongs to any groups
         has_group_perm = PagePermission.objects.filter(
             page=page,
@@ -96,6 +102,75 @@ def check_permission(user, page, required_level):
     return False
 
 
+def check_permissions_bulk(checks):
+    """
+    Evaluates many permission checks at once, with the same semantics as check_permission.
+
+    Superuser/owner checks are answered without queries; all remaining checks are
+    resolved from a single PagePermission query covering every page and user involved.
+
+    Args:
+        checks (iterable): (user, page, required_level) triples.
+
+    Returns:
+        list[bool]: One result per triple, in input order.
+    """
+    checks = list(checks)
+    results = [False] * len(checks)
+    pending = [] # Indexes of checks that need the permission table
+    page_ids, user_ids = set(), set()
+
+    for i, (user, page, required_level) in enumerate(checks):
+        if not isinstance(page, Page):
+            logger.warning(f"check_permissions_bulk called with non-Page object: {type(page)}")
+            continue
+        if not user or not user.is_authenticated:
+            # Anonymous users can only potentially have public VIEW permission
+            if required_level == PagePermission.Level.VIEW:
+                pending.append(i)
+                page_ids.add(page.pk)
+            continue
+        if not isinstance(user, User):
+            logger.error(f"check_permissions_bulk called with non-User object for authenticated check: {type(user)}")
+            continue
+        if user.is_superuser or page.owner_id == user.pk:
+            results[i] = True
+            continue
+        pending.append(i)
+        page_ids.add(page.pk)
+        user_ids.add(user.pk)
+
+    if not pending:
+        return results
+
+    # One query: every USER grant for the involved users, every GROUP grant reaching them
+    # through a membership, and every PUBLIC grant on the involved pages.
+    granted = defaultdict(set) # (page_id, user_id) -> levels granted directly or via groups
+    public_view_page_ids = set()
+    rows = PagePermission.objects.filter(page_id__in=page_ids).filter(
+        Q(target_type=PagePermission.TargetType.USER, target_user_id__in=user_ids) |
+        Q(target_type=PagePermission.TargetType.GROUP, target_group__members__in=user_ids) |
+        Q(target_type=PagePermission.TargetType.PUBLIC, level=PagePermission.Level.VIEW)
+    ).order_by().values_list('page_id', 'level', 'target_type', 'target_user_id', 'target_group__members')
+
+    for page_id, level, target_type, target_user_id, member_id in rows:
+        if target_type == PagePermission.TargetType.PUBLIC:
+            public_view_page_ids.add(page_id)
+        elif target_type == PagePermission.TargetType.USER:
+            granted[(page_id, target_user_id)].add(level)
+        elif member_id is not None:
+            granted[(page_id, member_id)].add(level)
+
+    for i in pending:
+        user, page, required_level = checks[i]
+        if user and user.is_authenticated and granted[(page.pk, user.pk)] & _SATISFYING_LEVELS.get(required_level, set()):
+            results[i] = True
+        elif required_level == PagePermission.Level.VIEW and page.pk in public_view_page_ids:
+            results[i] = True
+
+    return results
+
+
 # --- DRF Permission Classes ---
 
 class CanViewPage(permissions.BasePermission):
@@ -0,0 +1,13 @@
+# Response body encoding helpers.
+# Like app.parsers, uses orjson when it is installed and the stdlib json module otherwise.
+
+import json
+
+from .parsers import orjson
+
+
+def json_bytes(obj):
+    """ Compact UTF-8 JSON encoding of plain dicts/lists/strings/numbers. """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
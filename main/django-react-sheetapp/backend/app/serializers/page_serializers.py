@@ -90,22 +90,50 @@ class PageDataColumnSerializer(serializers.Serializer):
     width = serializers.IntegerField(default=150, min_value=10, max_value=2000)
 
 
+class CellValuesField(serializers.Field):
+    """
+    The list of cell values for one row of the PageDataSerializer payload.
+    Accepts what ListField(child=CharField(allow_blank=True)) accepts (strings are
+    whitespace-trimmed, numbers coerced to strings) but checks the whole list in one loop
+    instead of one CharField.run_validation call per cell, which dominated large saves.
+    """
+    default_error_messages = {
+        'not_a_list': 'Expected a list of items but got type "{input_type}".',
+        'invalid': 'Cell values must be strings.',
+        'null_characters': 'Null characters are not allowed.',
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        values = []
+        for value in data:
+            if isinstance(value, str):
+                if '\x00' in value:
+                    self.fail('null_characters')
+                values.append(value.strip())
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                values.append(str(value))
+            else:
+                self.fail('invalid')
+        return values
+
+    def to_representation(self, value):
+        return list(value)
+
+
 class PageDataRowSerializer(serializers.Serializer):
     """ Represents a single row within the PageDataSerializer payload. """
     # FIX: Removed redundant source='id' (if it was present)
     id = serializers.CharField(required=False, allow_null=True)
     order = serializers.IntegerField(min_value=1)
-    cells = serializers.ListField(
-        # *** FIX: Ensure child CharField explicitly allows blank values ***
-        child=serializers.CharField(allow_blank=True),
-        required=True,
-        allow_empty=True # Allow rows with zero cells if columns are zero
-    )
+    # Blank values and empty lists (zero columns) are allowed
+    cells = CellValuesField(required=True)
 
 
 class PageDataSerializer(serializers.Serializer):
     """
-    Serializer used by PageDataView (retrieve) and PageSaveView (post).
+    Serializer used by the PageViewSet data (GET) and save_data (POST) actions.
     Handles the full structure: columns, rows, and cell values.
     """
     # Fields included when retrieving full page data
@@ -114,6 +142,7 @@ class PageDataSerializer(serializers.Serializer):
     name = serializers.CharField(read_only=True)
     slug = serializers.SlugField(read_only=True)
     owner = UserBasicSerializer(read_only=True)
+    revision = serializers.IntegerField(read_only=True)
 
     # Fields used for both retrieving and saving (payload structure)
     columns = PageDataColumnSerializer(many=True)
@@ -124,6 +153,10 @@ class PageDataSerializer(serializers.Serializer):
         required=False, allow_blank=True, write_only=True, max_length=500,
         help_text="Optional message describing the changes made."
     )
+    base_revision = serializers.IntegerField(
+        required=False, min_value=0, write_only=True,
+        help_text="Page revision the edits were based on; the save is rejected with 409 if it is stale."
+    )
 
     def validate_columns(self, columns_data):
         """ Validates the list of column objects in the save payload. """
@@ -157,12 +190,11 @@ class PageDataSerializer(serializers.Serializer):
         columns = data.get('columns', [])
         rows = data.get('rows', [])
         num_columns = len(columns)
-        logger.debug(f"PageDataSerializer validate: Num columns = {num_columns}, Num rows = {len(rows)}")
+        logger.debug("PageDataSerializer validate: Num columns = %s, Num rows = %s", num_columns, len(rows))
 
         for i, row in enumerate(rows):
             row_cells = row.get('cells')
-            # Log the type and content of cells being validated
-            logger.debug(f"Validating row index {i} (Order: {row.get('order')}): Cells data type = {type(row_cells)}, Content = {row_cells}")
+            # (No per-row debug logging here: formatting every row's cells cost more than validating them)
 
             # Check if 'cells' is actually a list
             if not isinstance(row_cells, list):
@@ -179,14 +211,8 @@ class PageDataSerializer(serializers.Serializer):
                      f"rows[{i}].cells": f"Incorrect number of cells. Expected {num_columns}, got {len(row_cells)}."
                  })
 
-            # The 'allow_blank=True' on the ListField's child CharField *should* handle blank strings.
-            # If the 'This field may not be blank' error still appears, it suggests either:
-            # 1. The payload isn't sending strings (e.g., sending `null`). Check frontend Network tab Request Payload.
-            # 2. A complex interaction with DRF validation isn't respecting allow_blank in this nested context.
-            # We rely on the ListField's child validation here. Explicit checks below are for extreme debugging.
-            # for j, cell_value in enumerate(row_cells):
-            #     if cell_value == "" and not serializers.CharField(allow_blank=True).allow_blank: # Simulate check
-            #         logger.critical(f"INTERNAL VALIDATION MISMATCH?: Cell [{i},{j}] is blank but allow_blank check failed.")
+            # Individual cell values (blank allowed, must be strings/numbers) were already
+            # checked by CellValuesField.
 
         logger.debug("PageDataSerializer cross-field validation passed.")
         return data
@@ -1,4 +1,5 @@
 import logging
+from django.db import models
 from rest_framework import serializers
 # Import necessary models, including PagePermission
 from ..models import Todo, TodoStatus, Page, Row, PagePermission
@@ -21,6 +22,20 @@ class TodoStatusSerializer(serializers.ModelSerializer):
         fields = ['id', 'row_id', 'row_order', 'status', 'updated_at']
         read_only_fields = ['id', 'row_id', 'row_order', 'updated_at'] # Only status is writable via dedicated endpoint
 
+class TodoListListSerializer(serializers.ListSerializer):
+    """
+    many=True wrapper for TodoListSerializer that renders items one at a time.
+    An unpaginated queryset is read with iterator() so model instances are not all
+    cached on the queryset alongside their rendered dicts. The result is a list
+    (not a generator) because BaseSerializer.data caches it and may be read again.
+    """
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        if isinstance(iterable, models.QuerySet):
+            iterable = iterable.iterator(chunk_size=500)
+        return [self.child.to_representation(item) for item in iterable]
+
+
 class TodoListSerializer(serializers.ModelSerializer):
     # FIX: Removed redundant source='id'
     id = serializers.CharField(read_only=True) # Represent UUID as string
@@ -31,6 +46,8 @@ class TodoListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Todo
         fields = ['id', 'name', 'slug', 'source_page_slug', 'source_page_name', 'creator', 'is_personal', 'created_at']
+        read_only_fields = fields # List entries are display-only
+        list_serializer_class = TodoListListSerializer
 
 
 class TodoDetailSerializer(serializers.ModelSerializer):
@@ -87,6 +87,10 @@ class RegisterSerializer(serializers.ModelSerializer):
              # Raise a validation error to signal failure back to the view
              raise serializers.ValidationError("Failed to create user due to an internal error.")
 
+    def to_representation(self, instance):
+        """ Render the created user with UserSerializer's fields so the view can return serializer.data directly. """
+        return UserSerializer(instance, context=self.context).to_representation(instance)
+
 
 class LoginSerializer(serializers.Serializer):
     """ Serializer for user login validation. """
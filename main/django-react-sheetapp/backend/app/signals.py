@@ -1,6 +1,43 @@
 # This file can be used to define Django signals for the 'app'.
 # Signals allow certain senders to notify a set of receivers when certain actions occur.
 
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .models import Group, PagePermission, UserGroupMembership
+
+# Cache key holding the page-list cache version (see PageViewSet.list). Bumping it orphans
+# every cached page list, whose keys embed the version they were built under.
+PAGE_LIST_VERSION_KEY = 'pagelist:version'
+
+
+def _bump_page_list_version():
+    try:
+        cache.incr(PAGE_LIST_VERSION_KEY)
+    except ValueError: # Key missing (first bump, or evicted)
+        cache.set(PAGE_LIST_VERSION_KEY, 1, None)
+
+
+@receiver(post_save, sender=PagePermission)
+@receiver(post_delete, sender=PagePermission)
+@receiver(post_save, sender=UserGroupMembership)
+@receiver(post_delete, sender=UserGroupMembership)
+def invalidate_page_lists_on_grant_change(sender, **kwargs):
+    """
+    Grants and group memberships decide which pages a user can see, and changing them need
+    not touch any page's updated_at or the visible count. Bump after commit so a concurrent
+    list cannot re-cache the old visibility under the new version.
+    """
+    transaction.on_commit(_bump_page_list_version)
+
+
+@receiver(m2m_changed, sender=Group.members.through)
+def invalidate_page_lists_on_membership_change(sender, action, **kwargs):
+    """ group.members.add()/remove()/clear() bypass the through model's save/delete signals. """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(_bump_page_list_version)
+
 # Example: Automatically setting permissions when a Page is created
 # (Note: This logic is currently handled in the PageViewSet.perform_create for simplicity,
 # but signals are an alternative.)
@@ -0,0 +1,19 @@
+# Test data factories built on factory_boy.
+# These only use `build()` strategies so they never touch the database;
+# they produce plain dicts shaped like the API payloads.
+
+import factory
+
+
+class PagePayloadFactory(factory.DictFactory):
+    """
+    Builds a PageViewSet.save_data payload ({'columns': [...], 'rows': [...]}) without any ORM access.
+    Pass `cells=[...]` to control the cell values of the single generated row.
+    """
+    class Params:
+        cells = ['']
+
+    columns = factory.List([
+        factory.Dict({'id': None, 'name': 'A', 'order': 1, 'width': 100}),
+    ])
+    rows = factory.LazyAttribute(lambda o: [{'id': None, 'order': 1, 'cells': list(o.cells)}])
@@ -1,8 +1,13 @@
+from unittest import mock
+
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.middleware.csrf import get_token
+from .. import backends
+from ..backends import EmailBackend
 
 User = get_user_model()
 
@@ -65,6 +70,8 @@ class AuthAPITests(APITestCase):
     def test_register_user_password_mismatch(self):
         """ Test registration failure with mismatched passwords. """
         invalid_data = self.user_data.copy()
+        # Fresh identity so the uniqueness checks pass and only the password mismatch is reported
+        invalid_data.update(username='mismatchuser', email='mismatch@example.com')
         invalid_data['password2'] = 'wrongpassword'
         response = self.client.post(self.register_url, invalid_data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -122,6 +129,19 @@ class AuthAPITests(APITestCase):
         self.assertFalse(response.data['isAuthenticated'])
         self.assertIsNone(response.data['user'])
 
+    def test_auth_status_conditional_get(self):
+        """ A repeat status poll with a matching ETag gets 304; logging in changes the ETag. """
+        first = self.client.get(self.status_url)
+        etag = first['ETag']
+        self.assertIn('no-cache', first['Cache-Control'])
+        self.assertEqual(self.client.get(self.status_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(user=self.existing_user)
+        response = self.client.get(self.status_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['isAuthenticated'])
+        self.assertNotEqual(response['ETag'], etag)
+
     def test_logout_user_success(self):
         """ Test successful user logout and session termination. """
         self._get_csrf_token()
@@ -147,3 +167,37 @@ class AuthAPITests(APITestCase):
         response = self.client.post(self.logout_url, {}, format='json')
         # Should fail because user is not authenticated (permission denied)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class EmailBackendTests(TestCase):
+    """ Tests for app.backends.EmailBackend, including the unknown-email timing path. """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="backend@example.com", username="backend_user", password="right-pw")
+        cls.inactive = User.objects.create_user(email="inactive@example.com", username="inactive_user", password="right-pw", is_active=False)
+
+    def setUp(self):
+        self.backend = EmailBackend()
+
+    def test_valid_credentials(self):
+        """ The right password for an active user authenticates. """
+        self.assertEqual(self.backend.authenticate(None, username="backend@example.com", password="right-pw"), self.user)
+
+    def test_wrong_password_rejected(self):
+        """ A wrong password for an existing email returns None. """
+        self.assertIsNone(self.backend.authenticate(None, username="backend@example.com", password="wrong-pw"))
+
+    def test_inactive_user_rejected(self):
+        """ The right password is not enough for an inactive account. """
+        self.assertIsNone(self.backend.authenticate(None, username="inactive@example.com", password="right-pw"))
+
+    def test_unknown_email_still_hashes(self):
+        """ An unknown email returns None after one password check against the cached dummy hash. """
+        backends._dummy_password_hash.cache_clear()
+        with mock.patch.object(backends, 'check_password', wraps=backends.check_password) as check, \
+                mock.patch.object(backends, 'make_password', wraps=backends.make_password) as make:
+            self.assertIsNone(self.backend.authenticate(None, username="nobody@example.com", password="pw"))
+            self.assertIsNone(self.backend.authenticate(None, username="nobody2@example.com", password="pw"))
+        self.assertEqual(check.call_count, 2) # One verification per miss, as for a real account
+        self.assertEqual(make.call_count, 1) # Dummy hash built once, then reused
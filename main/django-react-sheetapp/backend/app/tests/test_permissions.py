@@ -2,7 +2,7 @@ from django.test import TestCase
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.auth import get_user_model
 from ..models import Page, Group, PagePermission
-from ..permissions import check_permission, CanViewPage, CanEditPage, CanManagePagePermissions # Import your permission logic
+from ..permissions import check_permission, check_permissions_bulk, CanViewPage, CanEditPage, CanManagePagePermissions # Import your permission logic
 
 User = get_user_model()
 
@@ -46,17 +46,19 @@ class PermissionLogicTests(TestCase):
     # --- Test check_permission Helper ---
 
     def test_check_owner_permissions(self):
-        """ Owner should have all permissions. """
-        self.assertTrue(check_permission(self.owner, self.page_private, PagePermission.Level.VIEW))
-        self.assertTrue(check_permission(self.owner, self.page_private, PagePermission.Level.EDIT))
-        self.assertTrue(check_permission(self.owner, self.page_private, PagePermission.Level.MANAGE))
-        self.assertTrue(check_permission(self.owner, self.page_public, PagePermission.Level.MANAGE))
+        """ Owner should have all permissions, resolved without any DB queries. """
+        with self.assertNumQueries(0):
+            self.assertTrue(check_permission(self.owner, self.page_private, PagePermission.Level.VIEW))
+            self.assertTrue(check_permission(self.owner, self.page_private, PagePermission.Level.EDIT))
+            self.assertTrue(check_permission(self.owner, self.page_private, PagePermission.Level.MANAGE))
+            self.assertTrue(check_permission(self.owner, self.page_public, PagePermission.Level.MANAGE))
 
     def test_check_admin_permissions(self):
-        """ Admin (superuser) should have all permissions. """
-        self.assertTrue(check_permission(self.admin, self.page_private, PagePermission.Level.VIEW))
-        self.assertTrue(check_permission(self.admin, self.page_private, PagePermission.Level.EDIT))
-        self.assertTrue(check_permission(self.admin, self.page_private, PagePermission.Level.MANAGE))
+        """ Admin (superuser) should have all permissions, resolved without any DB queries. """
+        with self.assertNumQueries(0):
+            self.assertTrue(check_permission(self.admin, self.page_private, PagePermission.Level.VIEW))
+            self.assertTrue(check_permission(self.admin, self.page_private, PagePermission.Level.EDIT))
+            self.assertTrue(check_permission(self.admin, self.page_private, PagePermission.Level.MANAGE))
 
     def test_check_anonymous_permissions(self):
         """ Anonymous users should only access public view. """
@@ -92,6 +94,14 @@ class PermissionLogicTests(TestCase):
         # Other user (not in group)
         self.assertFalse(check_permission(self.other_user, self.page_group, PagePermission.Level.VIEW))
 
+    def test_group_membership_fetched_once_per_user_instance(self):
+        """ Repeated checks reuse the user's cached group IDs instead of re-querying memberships. """
+        member = User.objects.get(pk=self.group_member.pk) # Fresh instance, as on a new request
+        with self.assertNumQueries(3): # direct grant, group IDs, group grant
+            self.assertTrue(check_permission(member, self.page_group, PagePermission.Level.VIEW))
+        with self.assertNumQueries(2): # direct grant, group grant
+            self.assertTrue(check_permission(member, self.page_group, PagePermission.Level.EDIT))
+
     def test_check_public_permissions_authenticated(self):
          """ Test authenticated users accessing public pages. """
          # Viewer (no specific perm on public page) can view via PUBLIC
@@ -101,6 +111,44 @@ class PermissionLogicTests(TestCase):
          self.assertTrue(check_permission(self.editor, self.page_public, PagePermission.Level.EDIT))
 
 
+    # --- Test check_permissions_bulk Helper ---
+
+    # (user attribute, page attribute, required level, expected result)
+    CASES = [
+        ('owner', 'page_private', 'MANAGE', True),
+        ('admin', 'page_private', 'MANAGE', True),
+        ('anonymous', 'page_private', 'VIEW', False),
+        ('anonymous', 'page_public', 'VIEW', True),
+        ('anonymous', 'page_public', 'EDIT', False),
+        ('anonymous', 'page_group', 'VIEW', False),
+        ('viewer', 'page_private', 'VIEW', True),
+        ('viewer', 'page_private', 'EDIT', False),
+        ('editor', 'page_private', 'VIEW', True),
+        ('editor', 'page_private', 'EDIT', True),
+        ('editor', 'page_private', 'MANAGE', False),
+        ('manager', 'page_private', 'EDIT', True),
+        ('manager', 'page_private', 'MANAGE', True),
+        ('other_user', 'page_private', 'VIEW', False),
+        ('group_member', 'page_group', 'VIEW', True),
+        ('group_member', 'page_group', 'EDIT', True),
+        ('group_member', 'page_group', 'MANAGE', False),
+        ('other_user', 'page_group', 'VIEW', False),
+        ('viewer', 'page_public', 'VIEW', True),
+        ('viewer', 'page_public', 'EDIT', False),
+        ('editor', 'page_public', 'EDIT', True),
+    ]
+
+    def test_check_permissions_bulk_matrix(self):
+        """ The bulk helper matches check_permission semantics while issuing a single query. """
+        with self.assertNumQueries(1):
+            results = check_permissions_bulk([
+                (getattr(self, u), getattr(self, p), PagePermission.Level(l)) for u, p, l, _ in self.CASES
+            ])
+        for (u, p, l, expected), got in zip(self.CASES, results):
+            with self.subTest(user=u, page=p, level=l):
+                self.assertEqual(got, expected)
+
+
     # --- Test DRF Permission Classes (Optional - Requires mock request/view) ---
     # These tests are often better handled by integration tests on the actual views.
     # Example structure if testing directly:
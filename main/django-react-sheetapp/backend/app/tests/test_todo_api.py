@@ -1,61 +1,80 @@
 from django.urls import reverse
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
-from rest_framework.test import APITestCase, APIClient
-from ..models import Page, Column, Row, Cell, Todo, TodoStatus, PagePermission # Import necessary models
+from rest_framework.test import APITestCase
+from ..models import Page, Column, Row, Cell, Todo, TodoStatus, PagePermission, Group # Import necessary models
+from ..serializers import TodoListSerializer
 import uuid # For checking UUID format if needed
 
 User = get_user_model()
 
+# Shared password, hashed once at import and inserted pre-hashed for every fixture user
+_HASHED_PW = make_password("pw")
+
 class TodoAPITests(APITestCase):
-    """ Tests for the ToDo related API endpoints (/api/todos/, /api/todos/{pk}/status/{row_id}/). """
+    """
+    Tests for the ToDo related API endpoints (/api/todos/, /api/todos/{pk}/status/{row_id}/).
+
+    APITestCase is a django.test.TestCase: setUpTestData runs once per class and each test
+    is rolled back to a savepoint. Keep it that way (not APITransactionTestCase) so tests
+    don't pay for a full table flush on teardown.
+    """
 
     @classmethod
     def setUpTestData(cls):
-        # Create users
-        cls.creator = User.objects.create_user(email="creator_todo@example.com", username="todo_creator", password="pw")
-        cls.viewer = User.objects.create_user(email="viewer_todo@example.com", username="todo_viewer", password="pw")
-        cls.no_access = User.objects.create_user(email="no_access_todo@example.com", username="todo_no_access", password="pw")
-        cls.admin = User.objects.create_superuser(email="admin_todo@example.com", username="todo_admin", password="pw")
+        # One transaction and one bulk INSERT per model for the whole fixture
+        with transaction.atomic():
+            cls._create_fixture()
+
+    @classmethod
+    def _create_fixture(cls):
+        # Create users in one INSERT with the pre-hashed shared password (no per-user hashing)
+        cls.creator, cls.viewer, cls.no_access, cls.admin = User.objects.bulk_create([
+            User(email="creator_todo@example.com", username="todo_creator", password=_HASHED_PW, is_active=True),
+            User(email="viewer_todo@example.com", username="todo_viewer", password=_HASHED_PW, is_active=True),
+            User(email="no_access_todo@example.com", username="todo_no_access", password=_HASHED_PW, is_active=True),
+            User(email="admin_todo@example.com", username="todo_admin", password=_HASHED_PW, is_active=True, is_staff=True, is_superuser=True),
+        ])
 
         # Create source page and structure
         cls.source_page = Page.objects.create(name="Todo Source Page", owner=cls.creator)
-        cls.col1 = Column.objects.create(page=cls.source_page, name="Task", order=1)
-        cls.row1 = Row.objects.create(page=cls.source_page, order=1)
-        cls.row2 = Row.objects.create(page=cls.source_page, order=2)
-        Cell.objects.create(row=cls.row1, column=cls.col1, value="Task 1")
-        Cell.objects.create(row=cls.row2, column=cls.col1, value="Task 2")
+        [cls.col1] = Column.objects.bulk_create([Column(page=cls.source_page, name="Task", order=1)])
+        cls.row1, cls.row2 = Row.objects.bulk_create([Row(page=cls.source_page, order=i) for i in (1, 2)])
+        Cell.objects.bulk_create([
+            Cell(row=row, column=cls.col1, value=f"Task {i}") for i, row in enumerate((cls.row1, cls.row2), 1)
+        ])
 
         # Grant viewer permission on source page
-        PagePermission.objects.create(page=cls.source_page, level='VIEW', target_type='USER', target_user=cls.viewer)
+        PagePermission.objects.bulk_create([
+            PagePermission(page=cls.source_page, level='VIEW', target_type='USER', target_user=cls.viewer),
+        ])
 
-        # Create a personal ToDo by creator
-        cls.personal_todo = Todo.objects.create(name="Creator Personal", source_page=cls.source_page, creator=cls.creator, is_personal=True)
+        # A personal and a non-personal ToDo by creator. bulk_create skips Todo.save(),
+        # so the slugs it would generate are set explicitly.
+        cls.personal_todo, cls.public_todo = Todo.objects.bulk_create([
+            Todo(name="Creator Personal", slug="creator-personal", source_page=cls.source_page, creator=cls.creator, is_personal=True),
+            Todo(name="Creator Public", slug="creator-public", source_page=cls.source_page, creator=cls.creator, is_personal=False),
+        ])
         cls.personal_todo.initialize_statuses() # Create initial statuses
-
-        # Create a non-personal ToDo by creator
-        cls.public_todo = Todo.objects.create(name="Creator Public", source_page=cls.source_page, creator=cls.creator, is_personal=False)
         cls.public_todo.initialize_statuses()
 
         # URLs
         cls.todos_list_url = reverse('todo-list') # '/api/todos/'
         cls.personal_todo_detail_url = reverse('todo-detail', kwargs={'pk': cls.personal_todo.pk})
         cls.public_todo_detail_url = reverse('todo-detail', kwargs={'pk': cls.public_todo.pk})
-        # Construct status update URL (need row ID)
-        cls.status_update_url_template = f"/api/todos/{cls.public_todo.pk}/status/{cls.row1.pk}/" # Example for public todo, row 1
+        # Status update URL for public todo, row 1 (route name from the update_status @action)
+        cls.row1_status_url = reverse('todo-update-status', kwargs={'pk': cls.public_todo.pk, 'row_id': cls.row1.pk})
+
 
+    # No setUp: APITestCase._pre_setup already gives each test a fresh APIClient as
+    # self.client (CSRF checks off by default, and force_authenticate bypasses them anyway).
 
-    def setUp(self):
-         self.client = APIClient()
-         # Helper to log in and get CSRF if needed (PATCH needs CSRF)
     def _login(self, user):
+        """ Helper to authenticate as a specific user (no CSRF round-trip needed). """
         self.client.force_authenticate(user=user)
-        response = self.client.get(reverse('auth-csrf'))
-        csrf_token = response.cookies.get('csrftoken')
-        if csrf_token:
-             self.client.credentials(HTTP_X_CSRFTOKEN=csrf_token.value)
-        else:
-             raise ValueError("CSRF token not obtained after login in ToDo test setup.")
 
 
     # --- List ToDos Tests ---
@@ -67,7 +86,8 @@ class TodoAPITests(APITestCase):
     def test_list_todos_creator(self):
         """ Creator sees both personal and non-personal ToDos they created. """
         self._login(self.creator)
-        response = self.client.get(self.todos_list_url)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.todos_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         results = response.data.get('results', response.data)
         self.assertEqual(len(results), 2)
@@ -78,12 +98,42 @@ class TodoAPITests(APITestCase):
     def test_list_todos_viewer(self):
         """ Viewer sees only non-personal ToDos for pages they can view. """
         self._login(self.viewer)
-        response = self.client.get(self.todos_list_url)
+        # Pinned: group IDs + count + one joined ToDo query (page visibility is a subquery),
+        # independent of ToDo and page count
+        with self.assertNumQueries(3):
+            response = self.client.get(self.todos_list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         results = response.data.get('results', response.data)
         self.assertEqual(len(results), 1) # Only the public one
         self.assertEqual(str(results[0]['id']), str(self.public_todo.id))
 
+    def test_list_serializer_streams_unpaginated_querysets(self):
+        """ many=True over a raw queryset renders the same items in one query, without caching instances. """
+        qs = Todo.objects.select_related('creator', 'source_page').order_by('created_at')
+        with self.assertNumQueries(1):
+            data = TodoListSerializer(qs, many=True).data
+        self.assertEqual([d['id'] for d in data], [str(self.personal_todo.id), str(self.public_todo.id)])
+        self.assertIsNone(qs._result_cache)
+
+    def test_list_serializer_data_can_be_read_twice(self):
+        """ The rendered list is cached on the serializer, so a second .data read is not empty. """
+        serializer = TodoListSerializer(Todo.objects.order_by('created_at'), many=True)
+        self.assertEqual(len(serializer.data), 2)
+        self.assertEqual(len(serializer.data), 2)
+
+    def test_group_ids_fetched_once_per_request(self):
+        """ Queryset filtering and the object permission check share one group-membership lookup. """
+        member = User.objects.create(email="member_todo@example.com", username="member_todo", password=_HASHED_PW)
+        group = Group.objects.create(name="Todo Readers", owner=self.creator)
+        group.members.add(member)
+        PagePermission.objects.create(page=self.source_page, level='VIEW', target_type='GROUP', target_group=group)
+        self._login(User.objects.get(pk=member.pk)) # Fresh instance, as on a new request
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.public_todo_detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        membership_queries = [q['sql'] for q in ctx.captured_queries if 'app_usergroupmembership' in q['sql']]
+        self.assertEqual(len(membership_queries), 1)
+
     def test_list_todos_no_access(self):
         """ User with no access to source page sees no ToDos (unless they created one). """
         # Create a todo for this user on the same page (they shouldn't see public_todo)
@@ -136,33 +186,36 @@ class TodoAPITests(APITestCase):
         """ Test retrieving ToDo details based on user permissions. """
         # Creator can view both
         self._login(self.creator)
-        res_pers = self.client.get(self.personal_todo_detail_url)
+        with self.assertNumQueries(3):
+            res_pers = self.client.get(self.personal_todo_detail_url)
         res_pub = self.client.get(self.public_todo_detail_url)
         self.assertEqual(res_pers.status_code, status.HTTP_200_OK)
         self.assertEqual(res_pub.status_code, status.HTTP_200_OK)
         self.assertEqual(res_pers.data['id'], str(self.personal_todo.id))
         self.assertIn('statuses', res_pers.data) # Check statuses are included
 
-        # Viewer can view public, but not personal
+        # Viewer can view public, but not personal. ToDos the user cannot see are filtered out
+        # by get_queryset, so they answer 404 (existence is not revealed) rather than 403.
         self._login(self.viewer)
         res_pers_viewer = self.client.get(self.personal_todo_detail_url)
-        res_pub_viewer = self.client.get(self.public_todo_detail_url)
-        self.assertEqual(res_pers_viewer.status_code, status.HTTP_403_FORBIDDEN)
+        with self.assertNumQueries(3):
+            res_pub_viewer = self.client.get(self.public_todo_detail_url)
+        self.assertEqual(res_pers_viewer.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(res_pub_viewer.status_code, status.HTTP_200_OK)
 
         # No_access user cannot view either (they didn't create them, can't view source page for public one)
         self._login(self.no_access)
         res_pers_no = self.client.get(self.personal_todo_detail_url)
         res_pub_no = self.client.get(self.public_todo_detail_url)
-        self.assertEqual(res_pers_no.status_code, status.HTTP_403_FORBIDDEN)
-        self.assertEqual(res_pub_no.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(res_pers_no.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(res_pub_no.status_code, status.HTTP_404_NOT_FOUND)
 
 
     # --- Update ToDo Status Tests ---
     def test_update_todo_status_success(self):
         """ Test creator can update status on their ToDo. """
         self._login(self.creator)
-        url = f"/api/todos/{self.public_todo.pk}/status/{self.row1.pk}/" # Update row1 status
+        url = self.row1_status_url # Update row1 status
         payload = {'status': 'IN_PROGRESS'}
         response = self.client.patch(url, payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -171,10 +224,26 @@ class TodoAPITests(APITestCase):
         status_entry = TodoStatus.objects.get(todo=self.public_todo, row=self.row1)
         self.assertEqual(status_entry.status, 'IN_PROGRESS')
 
+    def test_update_todo_status_is_a_single_write(self):
+        """ A changed status costs one UPDATE after the ToDo lookup; an unchanged one adds only an existence check. """
+        self._login(self.creator)
+        before = TodoStatus.objects.get(todo=self.public_todo, row=self.row1)
+        with self.assertNumQueries(3): # group IDs + ToDo lookup, conditional UPDATE
+            response = self.client.patch(self.row1_status_url, {'status': 'COMPLETED'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'row_id': str(self.row1.pk), 'status': 'COMPLETED'})
+        after = TodoStatus.objects.get(pk=before.pk)
+        self.assertEqual(after.status, 'COMPLETED')
+        self.assertGreater(after.updated_at, before.updated_at)
+        with self.assertNumQueries(3): # ToDo lookup (group IDs now cached on the user), no-op UPDATE, existence check
+            response = self.client.patch(self.row1_status_url, {'status': 'COMPLETED'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(TodoStatus.objects.get(pk=before.pk).updated_at, after.updated_at)
+
     def test_update_todo_status_permission_denied(self):
         """ Test user without permission cannot update status. """
         self._login(self.viewer) # Viewer can see public_todo but not edit status (based on IsCreatorOrAdminTodo)
-        url = f"/api/todos/{self.public_todo.pk}/status/{self.row1.pk}/"
+        url = self.row1_status_url
         payload = {'status': 'COMPLETED'}
         response = self.client.patch(url, payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -182,7 +251,7 @@ class TodoAPITests(APITestCase):
     def test_update_todo_status_invalid_status(self):
         """ Test providing an invalid status value fails. """
         self._login(self.creator)
-        url = f"/api/todos/{self.public_todo.pk}/status/{self.row1.pk}/"
+        url = self.row1_status_url
         payload = {'status': 'INVALID_STATUS'}
         response = self.client.patch(url, payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -192,7 +261,7 @@ class TodoAPITests(APITestCase):
         """ Test updating status for a row not belonging to the source page fails. """
         self._login(self.creator)
         invalid_row_id = uuid.uuid4() # Non-existent row ID
-        url = f"/api/todos/{self.public_todo.pk}/status/{invalid_row_id}/"
+        url = reverse('todo-update-status', kwargs={'pk': self.public_todo.pk, 'row_id': invalid_row_id})
         payload = {'status': 'COMPLETED'}
         response = self.client.patch(url, payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -20,7 +20,7 @@ urlpatterns = [
     path('', include(router.urls)),
 
     # --- Authentication Endpoints ---
-    path('auth/csrf/', auth_views.CsrfTokenView.as_view(), name='auth-csrf'),
+    path('auth/csrf/', auth_views.csrf_token_view, name='auth-csrf'),
     path('auth/register/', auth_views.RegisterView.as_view(), name='auth-register'),
     path('auth/login/', auth_views.LoginView.as_view(), name='auth-login'),
     path('auth/logout/', auth_views.LogoutView.as_view(), name='auth-logout'),
@@ -28,14 +28,9 @@ urlpatterns = [
     # Add password reset URLs etc. here if needed
 
     # --- Page Specific Action Endpoints ---
-    # Retrieve full page data (structure + cells)
-    path('pages/<slug:page_slug>/data/', page_views.PageDataView.as_view(), name='page-data'),
-    # Save page data (structure + cells)
-    path('pages/<slug:page_slug>/save/', page_views.PageSaveView.as_view(), name='page-save'),
-    # Update column widths specifically
-    path('pages/<slug:page_slug>/columns/width/', page_views.ColumnWidthUpdateView.as_view(), name='column-width-update'),
-    # List historical versions of a page
-    path('pages/<slug:page_slug>/versions/', page_views.PageVersionListView.as_view(), name='page-versions'),
+    # Page data/save/column-width/version endpoints are `@action`s on PageViewSet,
+    # which the router maps to `/api/pages/{slug}/data/`, `.../save/`, `.../columns/width/`
+    # and `.../versions/` (names: page-data, page-save, page-column-width-update, page-versions).
     # Add endpoints for managing page permissions later
     # path('pages/<slug:page_slug>/permissions/', page_views.PagePermissionView.as_view(), name='page-permissions'),
 
@@ -2,11 +2,24 @@
 # It allows easier importing of views.
 # e.g., from app.views import PageViewSet
 
-# Import view modules to make them accessible via app.views
-from . import auth_views
-from . import page_views
-from . import todo_views
-# from . import permission_views # Add later if creating Group/Permission management views
-
-# Optionally define __all__ if you want to control wildcard imports
-# __all__ = ['auth_views', 'page_views', 'todo_views']
\ No newline at end of file
+# View modules are imported lazily (PEP 562) on first attribute access, e.g. `app.views.page_views`
+# or `from .views import page_views`. Importing the package alone no longer pulls in DRF and the
+# serializer/model closure, which keeps management commands that never touch views fast to start.
+import importlib
+
+_VIEW_MODULES = frozenset({'auth_views', 'page_views', 'todo_views'})
+# 'permission_views' # Add later if creating Group/Permission management views
+
+__all__ = sorted(_VIEW_MODULES)
+
+
+def __getattr__(name):
+    if name in _VIEW_MODULES:
+        module = importlib.import_module(f'.{name}', __name__)
+        globals()[name] = module # Cache so later lookups skip __getattr__
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _VIEW_MODULES)
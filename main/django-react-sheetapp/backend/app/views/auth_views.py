@@ -1,31 +1,36 @@
+import hashlib
 import logging
 from rest_framework import generics, status, permissions, views
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django.contrib.auth import authenticate, login, logout
-from django.middleware.csrf import get_token
+from django.http import HttpResponse
 # Use relative imports within the app
 from ..serializers import UserSerializer, RegisterSerializer, LoginSerializer
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_protect, csrf_exempt
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
 
 # Get the logger instance configured in settings.py
 logger = logging.getLogger(__name__)
 
-class CsrfTokenView(views.APIView):
+# Pre-encoded body: the response never varies, so there is nothing to negotiate or render per request.
+_CSRF_COOKIE_SET_BODY = b'{"message": "CSRF cookie set."}'
+
+@require_GET
+@ensure_csrf_cookie # Decorator that sets the CSRF cookie on the response
+def csrf_token_view(request):
     """
     A simple view to ensure the CSRF cookie is set for the frontend.
     The frontend JavaScript needs this cookie to be present to read the token value
     and include it in the 'X-CSRFToken' header for POST/PUT/PATCH/DELETE requests.
-    """
-    permission_classes = [permissions.AllowAny] # Accessible by anyone
 
-    @method_decorator(ensure_csrf_cookie) # Decorator that sets the CSRF cookie on the response
-    def get(self, request, *args, **kwargs):
-        # The main purpose is served by the decorator setting the cookie.
-        # Optionally, we can return the token value in the response body if needed.
-        csrf_token = get_token(request)
-        logger.debug(f"CSRF cookie set via CsrfTokenView. Token value: {csrf_token}") # Log token for debug
-        return Response({'message': 'CSRF cookie set.'})
+    Plain Django function view (no DRF dispatch, content negotiation or renderers):
+    it is hit on every frontend page load and only exists for its cookie.
+    """
+    logger.debug("CSRF cookie set via csrf_token_view.")
+    return HttpResponse(_CSRF_COOKIE_SET_BODY, content_type='application/json')
 
 
 class RegisterView(generics.CreateAPIView):
@@ -39,18 +44,17 @@ class RegisterView(generics.CreateAPIView):
         """ Handles POST request for user registration. """
         logger.info(f"Registration attempt received for email: {request.data.get('email')}")
         serializer = self.get_serializer(data=request.data)
+        # Invalid input raises ValidationError, which DRF's exception handler turns into a 400 with the field errors
+        serializer.is_valid(raise_exception=True)
         try:
-            serializer.is_valid(raise_exception=True) # Validate input data, raise error if invalid
             user = serializer.save() # Serializer's create() method handles user creation and password hashing
             logger.info(f"User '{user.email}' registered successfully.")
-            # Return the newly created user's data (excluding sensitive info like password)
-            return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
-        except serializers.ValidationError:
-            # Log validation errors (already logged by DRF default handler potentially)
-            logger.warning(f"Registration validation failed: {serializer.errors}")
-            # is_valid(raise_exception=True) automatically returns 400 response with errors
-            # This block is technically redundant if raise_exception=True, but kept for clarity
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            # Return the newly created user's data (excluding sensitive info like password).
+            # RegisterSerializer renders with UserSerializer's fields, so no second serializer is built here.
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        except ValidationError:
+            # Raised by RegisterSerializer.create(); let DRF render it as a 400
+            raise
         except Exception as e:
             # Catch unexpected errors during the save process
             logger.error(f"Unexpected error during user registration save: {e}", exc_info=True)
@@ -68,15 +72,11 @@ class LoginView(generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         """ Handles POST request for user login. """
         serializer = self.get_serializer(data=request.data)
-        try:
-            serializer.is_valid(raise_exception=True) # Validate email/password format
-        except serializers.ValidationError:
-            logger.warning(f"Login validation failed for input: {request.data.get('email')}, Errors: {serializer.errors}")
-            return Response({"error": "Invalid input provided."}, status=status.HTTP_400_BAD_REQUEST)
+        serializer.is_valid(raise_exception=True) # Validate email/password format; DRF returns the 400
 
         email = serializer.validated_data['email']
         password = serializer.validated_data['password']
-        logger.info(f"Login attempt for user: {email}")
+        logger.info("Login attempt for user: %s", email)
 
         # Use Django's authentication backend
         # Pass 'request' to authenticate for session/CSRF context if needed by backends
@@ -88,16 +88,16 @@ class LoginView(generics.GenericAPIView):
             if user.is_active:
                 # Log the user in, creating a session
                 login(request, user)
-                logger.info(f"User '{email}' logged in successfully.")
+                logger.info("User '%s' logged in successfully.", email)
                 # Return the logged-in user's data
                 return Response(UserSerializer(user).data, status=status.HTTP_200_OK)
             else:
                 # User account is disabled
-                logger.warning(f"Login failed for '{email}': Account is disabled.")
+                logger.warning("Login failed for '%s': Account is disabled.", email)
                 return Response({"error": "This account has been disabled."}, status=status.HTTP_403_FORBIDDEN)
         else:
             # Authentication failed (invalid email or password)
-            logger.warning(f"Login failed for '{email}': Invalid credentials.")
+            logger.warning("Login failed for '%s': Invalid credentials.", email)
             # Return a generic error message for security (don't reveal which part was wrong)
             return Response({"error": "Unable to log in with provided credentials."}, status=status.HTTP_401_UNAUTHORIZED)
 
@@ -128,6 +128,19 @@ class LogoutView(views.APIView):
              return Response({"message": "Logout processed, potential server error occurred."}, status=status.HTTP_200_OK)
 
 
+def _auth_status_etag(request):
+    """
+    ETag for AuthStatusView: changes whenever the status payload would change
+    (anonymous vs. authenticated, or any field rendered by UserSerializer, or a new login).
+    """
+    user = request.user
+    if not (user and user.is_authenticated):
+        return "anon"
+    state = (user.pk, user.username, user.email, user.first_name, user.last_name,
+             user.is_staff, user.date_joined, user.last_login)
+    return hashlib.md5(repr(state).encode(), usedforsecurity=False).hexdigest()
+
+
 class AuthStatusView(views.APIView):
     """
     API endpoint to check the current authentication status of the user making the request.
@@ -135,11 +148,17 @@ class AuthStatusView(views.APIView):
     """
     permission_classes = [permissions.AllowAny] # Allow anyone to check status
 
+    # The frontend polls this on nearly every page load. Responses carry an ETag so a repeat
+    # poll with If-None-Match gets an empty 304 without serializing the user again.
+    # no_cache (not max_age) forces revalidation, so a logout is never masked by a cached "authenticated".
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=_auth_status_etag))
     def get(self, request, *args, **kwargs):
         """ Handles GET request to check authentication status. """
         if request.user and request.user.is_authenticated:
             # User is logged in
-            logger.debug(f"Auth status check: User IS authenticated ({request.user.email})")
+            # Lazy %-style args: this endpoint is polled constantly and DEBUG is normally off
+            logger.debug("Auth status check: User IS authenticated (%s)", request.user.email)
             # Return authenticated status and basic user info
             return Response({
                 'isAuthenticated': True,
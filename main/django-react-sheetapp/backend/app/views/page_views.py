@@ -1,21 +1,161 @@
 import logging
-from django.shortcuts import get_object_or_404
-from django.db import transaction, IntegrityError, models
-from django.db.models import Prefetch
-from django.http import Http404 # Import Http404 for explicit raising if needed
-from rest_framework import viewsets, generics, status, permissions, views
+import uuid
+from collections import defaultdict
+from itertools import groupby, zip_longest
+from operator import itemgetter
+from django.core.cache import cache
+from django.db import transaction, IntegrityError
+from django.db.models import Count, F, Max, Prefetch
+from django.db.models.functions import Now
+from django.http import Http404, StreamingHttpResponse # Import Http404 for explicit raising if needed
+from rest_framework import viewsets, status, permissions
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
+from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError, NotFound
 # Use relative imports within the app
 from ..models import Page, Column, Row, Cell, Version, PagePermission, User, Group
 from ..serializers import (
     PageListSerializer, PageDetailSerializer, PageDataSerializer, VersionSerializer, UserSerializer, UserBasicSerializer,
     ColumnSerializer # Import component serializers if needed
 )
-from ..permissions import CanViewPage, CanEditPage, CanManagePagePermissions, check_permission
+from ..parsers import FastJSONParser
+from ..renderers import json_bytes
+from ..signals import PAGE_LIST_VERSION_KEY
+from ..permissions import CanViewPage, CanEditPage, CanManagePagePermissions, check_permission, VIEW_LEVELS
 
 logger = logging.getLogger(__name__) # Use logger configured in settings.py
 
+
+class VersionPagination(PageNumberPagination):
+    """
+    Pagination for a page's version history. Every version carries its full data snapshot,
+    so clients may shrink pages with ?page_size= but never request more than max_page_size.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+
+class PageSaveConflict(APIException):
+    """ Raised when a page save is based on a revision that another save has since replaced. """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This page was changed by someone else since you loaded it. Reload and reapply your edits."
+    default_code = 'conflict'
+
+# Cells whose new value is shared by at least this many changed cells are written with one
+# plain UPDATE ... WHERE id IN (...) per value; the rest go through bulk_update.
+_CELL_VALUE_CLUSTER_MIN = 10
+# Max objects per bulk_update statement: keeps each CASE WHEN expression (and its parameter
+# count) bounded no matter how many cells/columns a request touches.
+_BULK_UPDATE_BATCH_SIZE = 500
+
+# Pages with at least this many cells (rows x columns) get their data response streamed
+_STREAM_DATA_MIN_CELLS = 20000
+
+# Seconds a user's serialized page list is reused (see PageViewSet.list)
+_PAGE_LIST_CACHE_TTL = 30
+
+
+def _parse_payload_ids(items, kind):
+    """
+    Parses each payload item's 'id' once into a UUID (None for new items), in payload order.
+    The save diff then keys everything by native UUIDs, matching what the ORM returns.
+    Raises a DRF ValidationError for malformed IDs so they surface as 400, not 500.
+    """
+    ids = []
+    for item in items:
+        if not item.get('id'):
+            ids.append(None)
+            continue
+        try:
+            ids.append(uuid.UUID(str(item['id'])))
+        except ValueError:
+            raise ValidationError(f"Invalid payload: {kind} ID '{item['id']}' is not a valid UUID.")
+    return ids
+
+
+def _record_version(page_id, user_id, data_snapshot, commit_message):
+    """
+    Writes the Version row for a committed page save.
+    Registered with transaction.on_commit, so the snapshot INSERT (and encoding its JSON)
+    runs after the save transaction has released its row locks. The save itself is already
+    durable at that point: a failure here is logged and loses only the history entry.
+    """
+    try:
+        Version.objects.create(
+            page_id=page_id,
+            user_id=user_id,
+            data_snapshot=data_snapshot,
+            commit_message=commit_message
+        )
+        logger.info(f"Created new version snapshot for page {page_id}")
+    except Exception as e:
+        logger.error(f"Failed to record version snapshot for page {page_id}: {e}", exc_info=True)
+
+
+def _iter_row_cell_values(page, columns):
+    """
+    Yields (row_id, row_order, [cell values in column order]) for every row of the page.
+
+    One ordered scan of (row_id, row_order, column_order, value) tuples: no Row/Cell/Column
+    instances are built. The LEFT JOIN from Row keeps rows that have no cells; missing cells
+    come back as ''. `columns` must be the page's columns in display order.
+    """
+    num_columns = len(columns)
+    # Column.order -> position in the cells list (orders are normally 1..N, but don't assume it)
+    index_by_column_order = {col.order: i for i, col in enumerate(columns)}
+    # iterator(): tuples are consumed as they stream in, never cached on the queryset
+    row_cell_values = Row.objects.filter(page=page).order_by('order', 'cells__column__order').values_list(
+        'id', 'order', 'cells__column__order', 'cells__value'
+    ).iterator(chunk_size=2000)
+    # Tuples arrive grouped by row, cells already in column order
+    for (row_id, row_order), row_cells in groupby(row_cell_values, key=itemgetter(0, 1)):
+        # Initialize cell values list with empty strings, matching column count
+        ordered_cell_values = [''] * num_columns
+        for _, _, column_order, value in row_cells:
+            if column_order is None: # Row without any cells
+                continue
+            index = index_by_column_order.get(column_order)
+            if index is None:
+                # Log inconsistency if a cell's column isn't among the page's columns
+                logger.warning(f"Cell found for row {row_id} linked to unknown column order {column_order} on page {page.slug}")
+                continue
+            ordered_cell_values[index] = value
+        yield row_id, row_order, ordered_cell_values
+
+
+def _stream_page_data(header, rows):
+    """
+    Yields the page data JSON document in chunks: every top-level field except 'rows' first,
+    then one encoded row at a time. Produces the same document as the buffered response,
+    but only one row is ever held in memory.
+    """
+    yield json_bytes(header)[:-1] + b',"rows":['
+    for i, (row_id, row_order, cells) in enumerate(rows):
+        chunk = json_bytes({'id': str(row_id), 'order': row_order, 'cells': cells})
+        yield chunk if i == 0 else b',' + chunk
+    yield b']}'
+
+
+def _payload_matches_page(page, columns_payload, col_ids, rows_payload, row_ids):
+    """
+    True when saving the validated payload would leave the page exactly as it is:
+    same columns (id, name, width) and rows (id) in the same order, with the same cell values.
+    col_ids/row_ids are the parsed payload UUIDs (see _parse_payload_ids). Compared structurally, so an unchanged autosave costs two reads and no writes.
+    """
+    columns = list(page.columns.order_by('order'))
+    current_columns = [(c.id, c.name, c.width) for c in columns]
+    payload_columns = [(col_id, c['name'], c.get('width', 150)) for col_id, c in zip(col_ids, columns_payload)]
+    if current_columns != payload_columns:
+        return False
+    # Rows are compared lazily so the scan stops at the first difference
+    current_rows = ((row_id, cells) for row_id, _, cells in _iter_row_cell_values(page, columns))
+    payload_rows = ((row_id, list(r.get('cells', []))) for row_id, r in zip(row_ids, rows_payload))
+    sentinel = object()
+    return all(a == b for a, b in zip_longest(current_rows, payload_rows, fillvalue=sentinel))
+
+
 class PageViewSet(viewsets.ModelViewSet):
     """
     ViewSet for handling Pages.
@@ -32,16 +172,28 @@ class PageViewSet(viewsets.ModelViewSet):
         Dynamically filters the queryset based on the requesting user's permissions.
         Ensures users only see pages they are allowed to view in the list endpoint.
         """
+        # Page data actions authorize against the page object itself (403 rather than 404
+        # for pages outside the user's list), so they look up slugs in the unfiltered table.
+        if self.action == 'data':
+            # Owner and ordered columns only; rows and cells are read as plain tuples in data()
+            return Page.objects.select_related('owner').prefetch_related(
+                Prefetch('columns', queryset=Column.objects.order_by('order'))
+            )
+        if self.action == 'versions':
+            return Page.objects.select_related('owner')
+
         user = self.request.user
 
         # Case 1: Anonymous User - Only show publicly viewable pages
         if not user.is_authenticated:
             logger.debug("Filtering pages for anonymous user (public VIEW only)")
             # Query for pages that have a PUBLIC VIEW permission entry
+            # No DISTINCT needed: the unique_public_view_per_page constraint allows at most one
+            # PUBLIC VIEW row per page, so this join can't produce duplicates
             qs = Page.objects.filter(
                 permissions__target_type=PagePermission.TargetType.PUBLIC,
                 permissions__level=PagePermission.Level.VIEW
-            ).distinct() # Use distinct to avoid duplicates if multiple permissions match
+            )
 
         # Case 2: Superuser - Show all pages
         elif user.is_superuser:
@@ -51,42 +203,85 @@ class PageViewSet(viewsets.ModelViewSet):
         # Case 3: Authenticated User - Combine accessible pages
         else:
             logger.debug(f"Filtering pages for authenticated user: {user.email}")
-            # Get the groups the user is a member of
-            user_groups = user.member_of_groups.all() # Efficiently gets related groups
-
-            # Build Q objects for combining different access criteria with OR logic
-            owned_q = models.Q(owner=user)
-            # Check for VIEW level or higher (EDIT/MANAGE imply VIEW) for user/group permissions
-            view_levels = [PagePermission.Level.VIEW, PagePermission.Level.EDIT, PagePermission.Level.MANAGE]
-            user_perm_q = models.Q(
+            # IDs of the groups the user is a member of (cached on request.user, shared with permission checks)
+            user_group_ids = user.groups_cached
+
+            # One single-predicate leg per access path, combined with UNION (which also dedups),
+            # instead of OR-ing all predicates over one permissions join followed by DISTINCT.
+            # Each leg can use its own narrow index on PagePermission. Legs clear Page's default
+            # ordering with order_by(): ORDER BY isn't allowed inside a compound statement.
+            owned_ids = Page.objects.filter(owner=user).order_by().values('id')
+            user_perm_ids = Page.objects.filter(
                 permissions__target_type=PagePermission.TargetType.USER,
                 permissions__target_user=user,
-                permissions__level__in=view_levels
-            )
-            group_perm_q = models.Q(
+                permissions__level__in=VIEW_LEVELS
+            ).order_by().values('id')
+            group_perm_ids = Page.objects.filter(
                 permissions__target_type=PagePermission.TargetType.GROUP,
-                permissions__target_group__in=user_groups,
-                permissions__level__in=view_levels
-            )
-            public_perm_q = models.Q(
+                permissions__target_group_id__in=user_group_ids,
+                permissions__level__in=VIEW_LEVELS
+            ).order_by().values('id')
+            public_perm_ids = Page.objects.filter(
                 permissions__target_type=PagePermission.TargetType.PUBLIC,
                 permissions__level=PagePermission.Level.VIEW
-            )
+            ).order_by().values('id')
 
-            # Combine all conditions using OR (|) and fetch distinct pages
+            # Wrap the UNION as an id__in subquery so the outer query can still select_related and order
             qs = Page.objects.filter(
-                owned_q | user_perm_q | group_perm_q | public_perm_q
-            ).distinct()
+                id__in=owned_ids.union(user_perm_ids, group_perm_ids, public_perm_ids)
+            )
 
         # Optimize database query by prefetching the owner details
         # Order results by last updated time
-        return qs.select_related('owner').order_by('-updated_at')
+        qs = qs.select_related('owner').order_by('-updated_at')
+        if self.action == 'list':
+            # Load only the columns PageListSerializer renders; skips the owner's password hash,
+            # flags and profile fields. Not applied to detail actions, which may save the instance.
+            qs = qs.only(
+                'id', 'name', 'slug', 'created_at', 'updated_at',
+                'owner__id', 'owner__username', 'owner__email',
+            )
+        return qs
+
+    def list(self, request, *args, **kwargs):
+        """
+        Paginated list of the pages the user can view, cached per user for a short TTL.
+        The key carries the newest updated_at and the size of the visible set, so edits,
+        renames, creations and deletions miss the cache on the next request; one aggregate
+        query decides that. Grant and membership changes bump PAGE_LIST_VERSION_KEY (see
+        app.signals), which relies on the shared cache configured by REDIS_URL. Scheme and host are part of the key because the cached body holds
+        absolute page URLs.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        stamp = queryset.order_by().aggregate(latest=Max('updated_at'), total=Count('id'))
+        latest = stamp['latest'].timestamp() if stamp['latest'] else 0
+        version = cache.get(PAGE_LIST_VERSION_KEY, 0)
+        cache_key = (
+            f"pagelist:{version}:{request.scheme}://{request.get_host()}:{request.user.pk or 'anon'}:"
+            f"{latest}:{stamp['total']}:{request.query_params.urlencode()}"
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            data = self.get_paginated_response(self.get_serializer(page, many=True).data).data
+        else:
+            data = self.get_serializer(queryset, many=True).data
+        cache.set(cache_key, data, _PAGE_LIST_CACHE_TTL)
+        return Response(data)
 
     def get_serializer_class(self):
         """ Return the appropriate serializer class depending on the request action. """
         if self.action == 'list':
             # Use the summary serializer for the list view
             return PageListSerializer
+        elif self.action == 'data':
+            # Full structure + cell data for rendering the table
+            return PageDataSerializer
+        elif self.action == 'versions':
+            return VersionSerializer
         # For retrieve, create, update, partial_update use the detail serializer
         # which handles the 'name' field but not the full cell data.
         return PageDetailSerializer
@@ -111,6 +306,15 @@ class PageViewSet(viewsets.ModelViewSet):
         elif self.action == 'create':
             # Creating a new page requires the user to be authenticated
             permission_classes = [permissions.IsAuthenticated]
+        elif self.action == 'data':
+            # Reading the full table data requires VIEW permission (anonymous allowed for public pages)
+            permission_classes = [CanViewPage]
+        elif self.action in ['save_data', 'update_column_widths']:
+            # Modifying structure/cells/widths requires EDIT permission
+            permission_classes = [permissions.IsAuthenticated, CanEditPage]
+        elif self.action == 'versions':
+            # Listing version history requires VIEW permission
+            permission_classes = [permissions.IsAuthenticated, CanViewPage]
         # For 'list' action, IsAuthenticatedOrReadOnly allows access,
         # but the actual filtering happens in get_queryset.
 
@@ -132,8 +336,9 @@ class PageViewSet(viewsets.ModelViewSet):
                 page = serializer.save(owner=user)
                 logger.info(f"Page '{page.name}' (slug: {page.slug}) created successfully by {user.email}")
 
-                # Set up default columns (e.g., "Column A", "Column B")
-                page.setup_default_structure()
+                # Set up default columns (e.g., "Column A", "Column B"); the page is brand new,
+                # so skip the "already has columns" check
+                page.setup_default_structure(check_existing=False)
                 logger.debug(f"Default structure set up for page '{page.slug}'")
 
                 # Grant the creating user full permissions (VIEW, EDIT, MANAGE) on the new page
@@ -141,7 +346,8 @@ class PageViewSet(viewsets.ModelViewSet):
                     PagePermission(page=page, level=level, target_type=PagePermission.TargetType.USER, target_user=user, granted_by=user)
                     for level in [PagePermission.Level.VIEW, PagePermission.Level.EDIT, PagePermission.Level.MANAGE]
                 ]
-                PagePermission.objects.bulk_create(permissions_to_grant)
+                # ignore_conflicts: a retried create must not fail on grants that already exist
+                PagePermission.objects.bulk_create(permissions_to_grant, ignore_conflicts=True)
                 logger.info(f"Default owner permissions granted for page '{page.slug}' to user '{user.email}'")
 
         except IntegrityError as e:
@@ -182,35 +388,22 @@ class PageViewSet(viewsets.ModelViewSet):
             # Raise an error to signal failure
             raise ValidationError("An error occurred while trying to delete the page.")
 
+    # --- Page Data Actions ---
+    # Routed by the DefaultRouter under the detail URL (/api/pages/{slug}/data/, .../save/,
+    # .../columns/width/, .../versions/) so they share this viewset's lookup, permission
+    # and serializer resolution instead of running as separate APIView classes.
 
-class PageDataView(generics.RetrieveAPIView):
-    """
-    API endpoint specifically for retrieving the *full* data required to render a page's table,
-    including columns, rows, and all cell values in the correct order.
-    """
-    serializer_class = PageDataSerializer # Uses the serializer designed for the full data structure
-    permission_classes = [CanViewPage]     # Requires VIEW permission on the page object
-    lookup_field = 'slug'                  # Use slug from URL to find the Page
-    lookup_url_kwarg = 'page_slug'         # The name of the URL keyword argument
-
-    def get_queryset(self):
-        """ Optimize the database query by prefetching related objects needed for serialization. """
-        # Fetch the Page along with its related owner, columns (ordered), rows (ordered),
-        # and within each row, prefetch its cells along with the cell's related column (ordered).
-        return Page.objects.all().select_related('owner').prefetch_related(
-            Prefetch('columns', queryset=Column.objects.order_by('order')),
-            Prefetch('rows', queryset=Row.objects.order_by('order').prefetch_related(
-                Prefetch('cells', queryset=Cell.objects.select_related('column').order_by('column__order'))
-            ))
-        )
-
-    def retrieve(self, request, *args, **kwargs):
-        """ Retrieve the Page object and serialize its data into the required format. """
+    @action(detail=True, methods=['get'], url_path='data', url_name='data')
+    def data(self, request, slug=None):
+        """
+        Retrieve the *full* data required to render a page's table,
+        including columns, rows, and all cell values in the correct order.
+        """
         try:
             # get_object() handles lookup, 404, and permission checks via permission_classes
             page = self.get_object()
         except Http404:
-             logger.warning(f"Page data requested but not found: slug={kwargs.get('page_slug')}")
+             logger.warning(f"Page data requested but not found: slug={slug}")
              raise NotFound("Page not found.") # Use DRF's NotFound exception
 
         user_email = request.user.email if request.user.is_authenticated else "Anonymous"
@@ -218,34 +411,35 @@ class PageDataView(generics.RetrieveAPIView):
 
         # 1. Serialize Column Data
         # Use ColumnSerializer defined earlier, getting data from prefetched ordered columns
-        columns_data = ColumnSerializer(page.columns.all(), many=True).data
-
-        # 2. Serialize Row and Cell Data
-        rows_data = []
-        # Create a map from column ID (string) to its 0-based index for quick lookup
-        column_id_to_index = {col['id']: i for i, col in enumerate(columns_data)}
-        num_columns = len(columns_data)
-
-        # Iterate through prefetched, ordered rows
-        for row in page.rows.all():
-            # Initialize cell values list with empty strings, matching column count
-            ordered_cell_values = [''] * num_columns
-            # Iterate through the row's prefetched, ordered cells
-            for cell in row.cells.all():
-                col_id_str = str(cell.column.id) # Get column UUID as string
-                if col_id_str in column_id_to_index:
-                    index = column_id_to_index[col_id_str] # Find the correct index for this cell's column
-                    ordered_cell_values[index] = cell.value # Place value at the correct index
-                else:
-                    # Log inconsistency if a cell's column ID isn't found in the page's columns
-                     logger.warning(f"Cell (ID:{cell.id}) found for row {row.id} linked to unknown/deleted column {col_id_str} on page {page.slug}")
+        columns = page.columns.all()
+        columns_data = ColumnSerializer(columns, many=True).data
+
+        # Very large pages: stream the rows straight from the DB cursor instead of building the
+        # whole rows list and its encoded bytes in memory. Costs one COUNT to decide.
+        if len(columns) and Row.objects.filter(page=page).count() * len(columns) >= _STREAM_DATA_MIN_CELLS:
+            header = {
+                'id': str(page.id),
+                'name': page.name,
+                'slug': page.slug,
+                'owner': UserBasicSerializer(page.owner).data,
+                'revision': page.revision,
+                'columns': columns_data,
+            }
+            logger.debug(f"Streaming data for large page '{page.slug}'")
+            return StreamingHttpResponse(
+                _stream_page_data(header, _iter_row_cell_values(page, columns)),
+                content_type='application/json'
+            )
 
-            # Append the row data (ID, order, ordered cells) to the results
-            rows_data.append({
-                'id': str(row.id), # Row UUID as string
-                'order': row.order,
-                'cells': ordered_cell_values
-            })
+        # 2. Serialize Row and Cell Data (single ordered scan, see _iter_row_cell_values)
+        rows_data = [
+            {
+                'id': str(row_id), # Row UUID as string
+                'order': row_order,
+                'cells': ordered_cell_values,
+            }
+            for row_id, row_order, ordered_cell_values in _iter_row_cell_values(page, columns)
+        ]
 
         # 3. Prepare final dictionary matching PageDataSerializer structure
         output_data = {
@@ -253,6 +447,7 @@ class PageDataView(generics.RetrieveAPIView):
             'name': page.name,
             'slug': page.slug,
             'owner': UserBasicSerializer(page.owner).data, # Include basic owner info
+            'revision': page.revision, # Echoed back as 'base_revision' when saving
             'columns': columns_data,
             'rows': rows_data,
         }
@@ -261,38 +456,47 @@ class PageDataView(generics.RetrieveAPIView):
         return Response(serializer.data)
 
 
-class PageSaveView(views.APIView):
-    """
-    API endpoint to save changes to a page's structure (columns, rows) and cell data.
-    This view handles the complex logic of applying differences between the existing
-    state and the submitted payload (add, delete, update, reorder).
-    It creates a new Version snapshot upon successful save.
-    Uses pessimistic locking on the Page row to prevent concurrent save conflicts.
-    """
-    permission_classes = [permissions.IsAuthenticated, CanEditPage] # Requires EDIT permission
-
+    # Large payloads: decode with orjson when available (see FastJSONParser)
+    @action(detail=True, methods=['post'], url_path='save', url_name='save', parser_classes=[FastJSONParser])
     @transaction.atomic # Ensure all database operations within the save succeed or fail together
-    def post(self, request, page_slug):
-        """ Handles POST request containing the full page state to save. """
+    def save_data(self, request, slug=None):
+        """
+        Save changes to a page's structure (columns, rows) and cell data.
+        Applies the differences between the existing state and the submitted payload
+        (add, delete, update, reorder) and creates a new Version snapshot.
+        Uses optimistic concurrency: clients send the 'base_revision' they loaded and the
+        save is rejected with 409 if another save bumped the page revision in the meantime.
+        """
+        page_slug = slug
         logger.info(f"User '{request.user.email}' attempting to save page '{page_slug}'")
+
+        # Validate the incoming payload first: the locking strategy depends on 'base_revision'
+        serializer = PageDataSerializer(data=request.data)
+        serializer_valid = serializer.is_valid()
+        base_revision = serializer.validated_data.get('base_revision') if serializer_valid else None
+
         try:
-            # Fetch the Page instance and lock the row for the duration of the transaction
-            # This prevents other transactions from modifying this specific page row concurrently.
-            page = Page.objects.select_for_update().get(slug=page_slug)
-            logger.debug(f"Pessimistic lock acquired for page '{page_slug}'")
+            if base_revision is None:
+                # Legacy clients that don't send a revision keep the pessimistic row lock,
+                # so their saves still serialize instead of silently interleaving.
+                # of=('self',) keeps the lock on the page row even if joins are added to this query.
+                page = Page.objects.select_for_update(of=('self',)).get(slug=page_slug)
+                logger.debug(f"Pessimistic lock acquired for page '{page_slug}'")
+            else:
+                # No row lock: conflicts are detected by the revision check at the end
+                page = Page.objects.get(slug=page_slug)
         except Page.DoesNotExist:
             raise NotFound("Page not found.")
         except Exception as e:
              # Catch other potential errors during locking/fetching
              logger.error(f"Error fetching/locking page '{page_slug}' for save: {e}", exc_info=True)
+             transaction.set_rollback(True) # Returning (not raising) would otherwise commit the atomic block
              return Response({"error": "Failed to acquire lock for saving the page."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         # Check object-level edit permission after fetching the page
         self.check_object_permissions(request, page)
 
-        # Validate the incoming payload structure using PageDataSerializer
-        serializer = PageDataSerializer(data=request.data)
-        if not serializer.is_valid():
+        if not serializer_valid:
              logger.warning(f"Page save validation failed for '{page_slug}': {serializer.errors}")
              # Return validation errors to the client
              return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -302,24 +506,41 @@ class PageSaveView(views.APIView):
         columns_payload = validated_data.get('columns', [])
         rows_payload = validated_data.get('rows', [])
         commit_message = validated_data.get('commit_message', 'Page updated via API') # Default commit message
+        # Parse payload IDs once; all lookups below compare native UUIDs, never strings
+        payload_col_ids = _parse_payload_ids(columns_payload, 'Column')
+        payload_row_ids = _parse_payload_ids(rows_payload, 'Row')
+
+        # Autosaves frequently resend the current state unchanged: skip the diff, bulk writes and
+        # Version snapshot entirely and point the client at the latest existing version.
+        if _payload_matches_page(page, columns_payload, payload_col_ids, rows_payload, payload_row_ids):
+            latest_version_id = page.versions.order_by('-timestamp').values_list('id', flat=True).first()
+            logger.info(f"Save for page '{page.slug}' by '{request.user.email}' contained no changes; skipped.")
+            return Response({
+                "message": "No changes to save.",
+                "version_id": str(latest_version_id) if latest_version_id else None,
+                "revision": page.revision,
+            }, status=status.HTTP_200_OK)
+
+        # Fail fast on a stale revision before doing any writes
+        if base_revision is not None and base_revision != page.revision:
+            logger.info(f"Save for page '{page.slug}' by '{request.user.email}' rejected: base revision {base_revision} is stale (current {page.revision}).")
+            raise PageSaveConflict()
 
         try:
             # --- 1. Process Columns ---
             # Compare existing columns with payload to determine changes
 
-            # Map existing columns by their UUID string for quick lookup
-            existing_cols = {str(c.id): c for c in page.columns.all()}
-            # Set of column UUID strings present in the payload
-            payload_col_ids = {str(c['id']) for c in columns_payload if c.get('id')}
-            # Set of column UUID strings to be deleted (exist in DB but not in payload)
-            cols_to_delete_ids = set(existing_cols.keys()) - payload_col_ids
-
-            # Delete columns that are no longer in the payload
-            if cols_to_delete_ids:
-                deleted_count, _ = Column.objects.filter(page=page, id__in=cols_to_delete_ids).delete()
+            # Delete columns that are no longer in the payload; the set difference runs in SQL
+            deleted_count, _ = Column.objects.filter(page=page).exclude(
+                id__in=[col_id for col_id in payload_col_ids if col_id]
+            ).delete()
+            if deleted_count:
                 logger.info(f"Deleted {deleted_count} columns for page '{page_slug}'.")
-                # Refresh existing_cols map after deletion for accurate processing below
-                existing_cols = {str(c.id): c for c in page.columns.all()}
+
+            # Map the surviving columns by their UUID, as plain dicts (no model hydration)
+            existing_cols = {
+                c['id']: c for c in Column.objects.filter(page=page).values('id', 'name', 'order', 'width')
+            }
 
             # Lists to hold objects for bulk operations
             cols_to_update = []
@@ -328,23 +549,25 @@ class PageSaveView(views.APIView):
             processed_col_ids = set()
 
             # Iterate through payload columns IN ORDER to handle updates and creations
-            for i, col_data in enumerate(columns_payload):
-                col_id_str = str(col_data['id']) if col_data.get('id') else None
+            for i, (col_id, col_data) in enumerate(zip(payload_col_ids, columns_payload)):
                 target_order = i + 1 # Order is determined by position in payload array
 
-                if col_id_str and col_id_str in existing_cols:
+                if col_id and col_id in existing_cols:
                     # --- Update Existing Column ---
-                    col_instance = existing_cols[col_id_str]
-                    processed_col_ids.add(col_id_str) # Mark as processed
+                    current = existing_cols[col_id]
+                    processed_col_ids.add(col_id) # Mark as processed
                     # Check if any field needs updating
-                    if (col_instance.name != col_data['name'] or
-                        col_instance.order != target_order or
-                        col_instance.width != col_data.get('width', 150)): # Use default width if not provided
-                        col_instance.name = col_data['name']
-                        col_instance.order = target_order
-                        col_instance.width = col_data.get('width', 150)
-                        cols_to_update.append(col_instance) # Add to bulk update list
-                elif not col_id_str:
+                    if (current['name'] != col_data['name'] or
+                        current['order'] != target_order or
+                        current['width'] != col_data.get('width', 150)): # Use default width if not provided
+                        # pk-only instance carrying the new values is enough for bulk_update
+                        cols_to_update.append(Column(
+                            pk=current['id'],
+                            name=col_data['name'],
+                            order=target_order,
+                            width=col_data.get('width', 150),
+                        ))
+                elif not col_id:
                     # --- Prepare New Column for Creation ---
                     cols_to_create.append(
                         Column(
@@ -356,8 +579,8 @@ class PageSaveView(views.APIView):
                     )
                 else:
                     # Error case: Payload contains an ID not found among existing columns
-                    logger.error(f"Consistency Error: Column ID '{col_id_str}' in payload not found for page '{page.slug}' after deletions.")
-                    raise ValidationError(f"Invalid payload: Column ID '{col_id_str}' does not exist for this page.")
+                    logger.error(f"Consistency Error: Column ID '{col_id}' in payload not found for page '{page.slug}' after deletions.")
+                    raise ValidationError(f"Invalid payload: Column ID '{col_id}' does not exist for this page.")
 
             # Perform bulk database operations for columns
             if cols_to_update:
@@ -370,126 +593,100 @@ class PageSaveView(views.APIView):
 
             # --- Re-fetch columns in their FINAL correct order for cell processing ---
             final_ordered_columns = list(page.columns.order_by('order'))
-            # Create maps for easy lookup by ID and order
-            final_col_id_map = {str(c.id): c for c in final_ordered_columns}
-            final_col_order_map = {c.order: c for c in final_ordered_columns} # Maps order (1, 2, ...) to Column instance
 
-            # --- 2. Process Rows ---
-            # Similar logic as for columns: find rows to delete, update, create
+            # --- 2. Process Rows and Cells (single pass over the payload rows) ---
+            # Delete rows missing from the payload first; their cells go with them (CASCADE)
+            deleted_count, _ = Row.objects.filter(page=page).exclude(
+                id__in=[row_id for row_id in payload_row_ids if row_id]
+            ).delete()
+            if deleted_count:
+                logger.info(f"Deleted {deleted_count} rows for page '{page.slug}'.")
 
-            existing_rows = {str(r.id): r for r in page.rows.all()}
-            payload_row_ids = {str(r['id']) for r in rows_payload if r.get('id')}
-            rows_to_delete_ids = set(existing_rows.keys()) - payload_row_ids
+            # Surviving rows as {uuid: order}; only id and order are needed
+            existing_rows = dict(Row.objects.filter(page=page).values_list('id', 'order'))
 
-            if rows_to_delete_ids:
-                deleted_count, _ = Row.objects.filter(page=page, id__in=rows_to_delete_ids).delete()
-                logger.info(f"Deleted {deleted_count} rows for page '{page.slug}'.")
-                existing_rows = {str(r.id): r for r in page.rows.all()} # Refresh map
+            # Stream all existing cells for the page *once* as plain tuples (no Cell instances).
+            # iterator() skips the queryset result cache (and uses a server-side cursor on
+            # Postgres), so only the lookup map below is held in memory. order_by() drops the
+            # default row/column ordering, which would otherwise join and sort for nothing.
+            existing_cells = Cell.objects.filter(row__page=page).order_by().values_list(
+                'id', 'row_id', 'column_id', 'value'
+            ).iterator(chunk_size=1000)
+            # Create a lookup map keyed by native UUIDs: {(row_id, column_id): (cell_pk, value)}
+            cell_key_map = {(row_id, col_id): (pk, value) for pk, row_id, col_id, value in existing_cells}
 
             rows_to_update = []
             rows_to_create = []
-            # Map to hold final row instances (keyed by their final order) for cell processing
-            final_ordered_rows_map = {} # Maps order (1, 2, ...) to Row instance
-            processed_row_ids = set()
-
-            for i, row_data in enumerate(rows_payload):
-                row_id_str = str(row_data['id']) if row_data.get('id') else None
-                target_order = i + 1 # Order determined by payload position
+            cells_to_update = [] # (cell_pk, new_value) pairs for cells whose value changed
+            cells_to_create = []
+            # Keep track of cell keys (row_id, col_id) that should exist based on payload
+            processed_cell_keys = set()
+            # Version snapshot rows, built as we go (matches the PageDataSerializer row format)
+            final_rows_for_snapshot_data = []
 
-                row_instance = None
-                if row_id_str and row_id_str in existing_rows:
+            # One pass: resolve each payload row to its instance, then diff its cells right away.
+            # New rows get their UUID on instantiation, so their cells can reference them before
+            # the rows are bulk-created below (rows are written before cells).
+            for target_order, (row_id, row_data) in enumerate(zip(payload_row_ids, rows_payload), start=1):
+                if row_id and row_id in existing_rows:
                     # --- Update Existing Row Order ---
-                    row_instance = existing_rows[row_id_str]
-                    processed_row_ids.add(row_id_str) # Mark as processed
-                    if row_instance.order != target_order:
-                        row_instance.order = target_order
+                    # pk-only instance: enough for bulk_update and for the cell FKs below
+                    row_instance = Row(pk=row_id, page=page, order=target_order)
+                    if existing_rows[row_id] != target_order:
                         rows_to_update.append(row_instance)
-                elif not row_id_str:
+                elif not row_id:
                     # --- Prepare New Row for Creation ---
                     # Create instance but don't save yet (bulk_create later)
                     row_instance = Row(page=page, order=target_order)
                     rows_to_create.append(row_instance)
                 else:
-                    logger.error(f"Consistency Error: Row ID '{row_id_str}' in payload not found for page '{page.slug}' after deletions.")
-                    raise ValidationError(f"Invalid payload: Row ID '{row_id_str}' does not exist for this page.")
+                    logger.error(f"Consistency Error: Row ID '{row_id}' in payload not found for page '{page.slug}' after deletions.")
+                    raise ValidationError(f"Invalid payload: Row ID '{row_id}' does not exist for this page.")
 
-                if row_instance: # Track the instance (saved or unsaved) by its intended final order
-                     final_ordered_rows_map[target_order] = row_instance
+                cell_values = row_data.get('cells', [])
+                # Validate cell count again just in case
+                if len(cell_values) != len(final_ordered_columns):
+                     logger.error(f"Cell count mismatch for row order {target_order} (ID: {row_instance.id}) on page '{page.slug}' during cell processing.")
+                     raise ValidationError(f"Internal data inconsistency: Row {target_order} cell count error during save.")
+
+                # Cell values line up with the final column order
+                for col_instance, cell_value in zip(final_ordered_columns, cell_values):
+                    key = (row_instance.id, col_instance.id)
+                    processed_cell_keys.add(key) # Mark this cell position as expected
+
+                    existing = cell_key_map.get(key)
+                    if existing is not None:
+                        # --- Update Existing Cell ---
+                        cell_pk, current_value = existing
+                        # Only update if the value has actually changed
+                        if current_value != cell_value:
+                            cells_to_update.append((cell_pk, cell_value))
+                    else:
+                        # --- Prepare New Cell for Creation ---
+                        cells_to_create.append(
+                            Cell(row=row_instance, column=col_instance, value=cell_value)
+                        )
+
+                final_rows_for_snapshot_data.append({
+                    'id': str(row_instance.id),
+                    'order': target_order,
+                    'cells': list(cell_values),
+                })
 
-            # Perform bulk operations for rows
+            # Perform bulk operations for rows (before cells, which reference them)
             if rows_to_update:
                 Row.objects.bulk_update(rows_to_update, ['order'])
                 logger.debug(f"Bulk updated {len(rows_to_update)} row orders for page '{page.slug}'.")
             if rows_to_create:
-                # Create new rows and get back instances with generated IDs
                 created_rows = Row.objects.bulk_create(rows_to_create)
                 logger.debug(f"Bulk created {len(created_rows)} rows for page '{page.slug}'.")
-                # Update the map with the newly created instances (using their order)
-                for r in created_rows:
-                    final_ordered_rows_map[r.order] = r
-
-
-            # --- 3. Process Cells ---
-            # Efficiently update/create/delete cells based on the final row/column structure
-
-            # Fetch all existing cells for the page *once* for efficient lookup
-            existing_cells = Cell.objects.filter(row__page=page)
-            # Create a lookup map: {(row_id_str, col_id_str): cell_instance}
-            cell_key_map = {(str(cell.row_id), str(cell.column_id)): cell for cell in existing_cells}
-
-            cells_to_update = []
-            cells_to_create = []
-            # Keep track of cell keys (row_id, col_id) that should exist based on payload
-            processed_cell_keys = set()
-
-            # Iterate through the payload rows again to determine cell states
-            for i, row_data in enumerate(rows_payload):
-                row_order = i + 1
-                # Get the corresponding Row instance (should exist in map after row processing)
-                if row_order not in final_ordered_rows_map:
-                     logger.error(f"Row order {row_order} missing from final map during cell processing for page '{page.slug}'. Save may be inconsistent.")
-                     continue # Skip if row instance is missing
-
-                row_instance = final_ordered_rows_map[row_order]
-                row_id_str = str(row_instance.id) # Get the row's actual ID (UUID string)
-
-                cell_values = row_data.get('cells', [])
-                # Validate cell count again just in case
-                if len(cell_values) != len(final_ordered_columns):
-                     logger.error(f"Cell count mismatch for row order {row_order} (ID: {row_id_str}) on page '{page.slug}' during cell processing.")
-                     raise ValidationError(f"Internal data inconsistency: Row {row_order} cell count error during save.")
-
-                # Iterate through cell values corresponding to the final column order
-                for j, cell_value in enumerate(cell_values):
-                    # Get the corresponding Column instance based on final order 'j+1'
-                    target_col_order = j + 1
-                    if target_col_order in final_col_order_map:
-                        col_instance = final_col_order_map[target_col_order]
-                        col_id_str = str(col_instance.id) # Column ID (UUID string)
-                        key = (row_id_str, col_id_str)
-                        processed_cell_keys.add(key) # Mark this cell position as expected
-
-                        if key in cell_key_map:
-                            # --- Update Existing Cell ---
-                            cell = cell_key_map[key]
-                            # Only update if the value has actually changed
-                            if cell.value != cell_value:
-                                cell.value = cell_value
-                                cells_to_update.append(cell)
-                        else:
-                            # --- Prepare New Cell for Creation ---
-                            cells_to_create.append(
-                                Cell(row=row_instance, column=col_instance, value=cell_value)
-                            )
-                    else:
-                         # This indicates an issue with column processing logic
-                         logger.error(f"Column order {target_col_order} not found in final map for row {row_id_str}, page '{page.slug}'.")
 
 
+            # --- 3. Write Cell Changes ---
             # --- Delete Orphaned Cells ---
             # Find cells existing in the DB but not present in the final structure defined by the payload
             cells_to_delete_ids = [
-                cell.id for key, cell in cell_key_map.items() if key not in processed_cell_keys
+                cell_pk for key, (cell_pk, _) in cell_key_map.items() if key not in processed_cell_keys
             ]
             if cells_to_delete_ids:
                 deleted_count, _ = Cell.objects.filter(id__in=cells_to_delete_ids).delete()
@@ -497,9 +694,21 @@ class PageSaveView(views.APIView):
 
             # --- Perform Bulk Cell Operations ---
             if cells_to_update:
-                # Update only the 'value' field for existing cells that changed
-                Cell.objects.bulk_update(cells_to_update, ['value'])
-                logger.debug(f"Bulk updated {len(cells_to_update)} cells for page '{page.slug}'.")
+                # Group by new value: large clusters (blanks, tags, categories) collapse into a
+                # single equality UPDATE each instead of one CASE branch per cell.
+                pks_by_value = defaultdict(list)
+                for cell_pk, value in cells_to_update:
+                    pks_by_value[value].append(cell_pk)
+                scattered_cells = []
+                for value, cell_pks in pks_by_value.items():
+                    if len(cell_pks) >= _CELL_VALUE_CLUSTER_MIN:
+                        Cell.objects.filter(id__in=cell_pks).update(value=value)
+                    else:
+                        scattered_cells.extend(Cell(pk=cell_pk, value=value) for cell_pk in cell_pks)
+                if scattered_cells:
+                    # Update only the 'value' field; pk-only instances are enough for bulk_update
+                    Cell.objects.bulk_update(scattered_cells, ['value'], batch_size=_BULK_UPDATE_BATCH_SIZE)
+                logger.debug(f"Updated {len(cells_to_update)} cells for page '{page.slug}'.")
             if cells_to_create:
                 # Create all new cells in one query
                 # Ensure row and column FKs are correctly set on the instances before bulk_create
@@ -508,34 +717,17 @@ class PageSaveView(views.APIView):
 
 
             # --- 4. Create Version Snapshot ---
-            # Generate the snapshot based on the FINAL state of the database after all updates
+            # Built from the state just written: final ordered columns plus the snapshot rows
+            # collected during the row pass (saved row IDs and the payload cell values, which
+            # are exactly what the cells now hold). No Row/Cell re-fetch is needed.
             logger.debug(f"Generating final state snapshot for versioning page '{page.slug}'...")
-            # Re-fetch final columns and rows with cells for the snapshot
             final_columns_for_snapshot = ColumnSerializer(final_ordered_columns, many=True).data
-            final_rows_for_snapshot_data = []
-            # Query rows with prefetched cells, ensuring correct ordering for snapshot consistency
-            final_rows_queryset = Row.objects.filter(page=page).order_by('order').prefetch_related(
-                 Prefetch('cells', queryset=Cell.objects.order_by('column__order')) # Crucial: Order cells by column order
-             )
-            # Build the snapshot structure matching PageDataSerializer format
-            for row in final_rows_queryset:
-                 final_rows_for_snapshot_data.append({
-                     'id': str(row.id),
-                     'order': row.order,
-                     'cells': [cell.value for cell in row.cells.all()] # Assumes prefetched cells are correctly ordered
-                 })
-
-            # Create the Version record
-            Version.objects.create(
-                page=page,
-                user=request.user,
-                data_snapshot={'columns': final_columns_for_snapshot, 'rows': final_rows_for_snapshot_data},
-                commit_message=commit_message
-            )
-            logger.info(f"Created new version snapshot for page '{page.slug}'")
+            data_snapshot = {'columns': final_columns_for_snapshot, 'rows': final_rows_for_snapshot_data}
 
-            # Update the page's 'updated_at' timestamp explicitly after all changes
-            page.save(update_fields=['updated_at'])
+            # Write the Version record once the save has committed (see _record_version).
+            # It becomes visible to version listings just after the save, not atomically with it.
+            user_id = request.user.pk
+            transaction.on_commit(lambda: _record_version(page.pk, user_id, data_snapshot, commit_message))
 
 
         # End of atomic transaction block
@@ -551,43 +743,78 @@ class PageSaveView(views.APIView):
         except Exception as e:
             # Catch any other unexpected exceptions during the save process
             logger.error(f"Unexpected error during page save '{page.slug}' by '{request.user.email}': {e}", exc_info=True)
+            # Roll back the writes made so far: returning (not raising) would otherwise commit a
+            # half-applied page without the revision bump, and a stale base_revision would still match
+            transaction.set_rollback(True)
             # Return a generic server error response
             return Response({"error": "An unexpected error occurred while saving the page."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        # Bump the revision (and 'updated_at') as the last statement, so the page row is only
+        # held for the tail of the transaction. With a base revision the UPDATE is conditional:
+        # if a concurrent save won the race it matches no row and the whole save rolls back.
+        page_rows = Page.objects.filter(pk=page.pk)
+        if base_revision is not None:
+            page_rows = page_rows.filter(revision=base_revision)
+        if not page_rows.update(revision=F('revision') + 1, updated_at=Now()):
+            logger.info(f"Save for page '{page.slug}' by '{request.user.email}' lost a concurrent update race on revision {base_revision}.")
+            raise PageSaveConflict()
+        new_revision = page.revision + 1 # base_revision == page.revision when one was sent
+
         # If transaction completes successfully
         logger.info(f"Page '{page.slug}' saved successfully by '{request.user.email}'.")
         # Return a success message. Frontend should typically re-fetch data for consistency.
-        return Response({"message": "Page saved successfully"}, status=status.HTTP_200_OK)
+        return Response({"message": "Page saved successfully", "revision": new_revision}, status=status.HTTP_200_OK)
 
 
-class ColumnWidthUpdateView(views.APIView):
-    """ API endpoint specifically for updating column widths efficiently. """
-    permission_classes = [permissions.IsAuthenticated, CanEditPage] # Requires EDIT permission
+    @action(detail=True, methods=['post'], url_path='columns/width', url_name='column-width-update')
+    def update_column_widths(self, request, slug=None):
+        """
+        Update column widths efficiently from a list of { "id", "width" } items,
+        where width is a JSON integer from 10 to 2000.
+        Changed columns are written with bulk_update in batches of at most
+        _BULK_UPDATE_BATCH_SIZE, so very wide pages never produce one unbounded statement.
+        """
+        # Expect payload like: { "updates": [{ "id": "uuid-str", "width": 180 }, ...] }
+        updates = request.data.get('updates')
+        if isinstance(updates, list) and updates:
+            return self._apply_column_widths(request, slug, updates)
+
+        # Nothing to apply, or a malformed body: answer 404/403 first as usual (so the payload
+        # contract is only revealed to editors), but without locking the page row
+        try:
+            page = Page.objects.only('id', 'owner').get(slug=slug)
+        except Page.DoesNotExist:
+            raise NotFound("Page not found.")
+        self.check_object_permissions(request, page)
+        if not isinstance(updates, list):
+            raise ValidationError({"error": "Invalid data format: 'updates' must be a list."})
+        return Response({"message": "Widths updated for columns: []"}, status=status.HTTP_200_OK)
 
     @transaction.atomic # Use transaction for atomicity if updating multiple columns
-    def post(self, request, page_slug):
-        """ Handles POST request with a list of column updates. """
+    def _apply_column_widths(self, request, page_slug, updates):
+        """ Validates and writes a non-empty list of width updates under the page row lock. """
         try:
             # Lock the page row to prevent conflicts, although less critical than full save
-            page = Page.objects.select_for_update().get(slug=page_slug)
+            # (only the page row, even if joins are added to this query). The width update and the
+            # permission check only need the page's id and owner, so the row is fetched narrow.
+            page = Page.objects.select_for_update(of=('self',)).only('id', 'owner').get(slug=page_slug)
         except Page.DoesNotExist:
             raise NotFound("Page not found.")
 
         # Check edit permission on the page object
         self.check_object_permissions(request, page)
 
-        # Expect payload like: { "updates": [{ "id": "uuid-str", "width": 180 }, ...] }
-        updates = request.data.get('updates')
-        if not isinstance(updates, list):
-            raise ValidationError({"error": "Invalid data format: 'updates' must be a list."})
-
         updated_col_ids = []
         errors = []
         columns_to_bulk_update = []
-        # Get all valid column IDs for this page upfront for validation
-        valid_column_ids = set(page.columns.values_list('id', flat=True))
+        # Load this page's columns once (only what the width update needs), keyed by canonical
+        # UUID string; a plain membership test then doubles as format and "belongs to this page" check
+        columns_by_id = {str(c.id): c for c in page.columns.only('id', 'width')}
 
         for update_data in updates:
+            if not isinstance(update_data, dict):
+                errors.append(f"Invalid update item (expected an object): {update_data}")
+                continue
             col_id = update_data.get('id')
             width = update_data.get('width')
 
@@ -599,52 +826,36 @@ class ColumnWidthUpdateView(views.APIView):
                  errors.append(f"Invalid column ID format: {col_id}")
                  continue
 
-             # Convert string ID to UUID for lookup (or keep as string if model uses CharField)
-            try:
-                 col_uuid = uuid.UUID(col_id) # Ensure valid UUID format
-                 if col_uuid not in valid_column_ids:
-                    errors.append(f"Column with id '{col_id}' not found for this page.")
-                    continue
-            except ValueError:
-                 errors.append(f"Invalid UUID format for column id: {col_id}")
-                 continue
+            column = columns_by_id.get(col_id)
+            if column is None:
+                errors.append(f"Column with id '{col_id}' not found for this page.")
+                continue
 
+            # Width must be a JSON integer (not a numeric string, float or bool) within
+            # reasonable min/max limits; checked with plain branches, no exceptions in the loop
+            if type(width) is not int or not 10 <= width <= 2000:
+                errors.append(f"Invalid width value '{width}' for column id '{col_id}': must be an integer between 10 and 2000 pixels.")
+                continue
 
-            try:
-                # Fetch the specific column instance (already validated it belongs to the page)
-                column = Column.objects.get(id=col_uuid)
-                # Validate width value
-                parsed_width = int(width)
-                if not (10 <= parsed_width <= 2000): # Define reasonable min/max width limits
-                    raise ValueError("Width must be between 10 and 2000 pixels.")
-
-                # Only update if the width has actually changed
-                if column.width != parsed_width:
-                    column.width = parsed_width
-                    columns_to_bulk_update.append(column) # Add to list for bulk update
-                updated_col_ids.append(col_id) # Track successfully processed IDs
-
-            except Column.DoesNotExist:
-                 # Should not happen if initial validation worked, but handle defensively
-                 errors.append(f"Column with id '{col_id}' unexpectedly not found during update.")
-            except (ValueError, TypeError) as e:
-                errors.append(f"Invalid width value '{width}' for column id '{col_id}': {e}")
-            except Exception as e:
-                logger.error(f"Error processing width update for col '{col_id}' on page '{page_slug}': {e}", exc_info=True)
-                errors.append(f"Internal error updating column '{col_id}'.")
+            # Only update if the width has actually changed
+            if column.width != width:
+                column.width = width
+                columns_to_bulk_update.append(column) # Add to list for bulk update
+            updated_col_ids.append(col_id) # Track successfully processed IDs
 
-        # If any errors occurred during validation, raise ValidationError to rollback transaction
+        # If any errors occurred during validation, raise ValidationError to rollback transaction.
+        # Logged once as a count; the individual messages go back to the client only.
         if errors:
-            logger.warning(f"Column width update failed for page '{page_slug}': {errors}")
+            logger.warning(f"Column width update produced {len(errors)} errors on page '{page_slug}'")
             raise ValidationError({"errors": errors})
 
         # If validation passed and there are columns to update, perform bulk update
         if columns_to_bulk_update:
             try:
-                Column.objects.bulk_update(columns_to_bulk_update, ['width'])
+                Column.objects.bulk_update(columns_to_bulk_update, ['width'], batch_size=_BULK_UPDATE_BATCH_SIZE)
                 logger.info(f"Updated widths for {len(columns_to_bulk_update)} columns on page '{page_slug}'.")
-                # Touch the page's updated_at timestamp
-                page.save(update_fields=['updated_at'])
+                # Touch the page's updated_at timestamp with a bare UPDATE (no model save or signals)
+                Page.objects.filter(pk=page.pk).update(updated_at=Now())
             except Exception as e:
                  # Catch errors during the bulk update itself
                  logger.error(f"Error during bulk update for column widths page '{page_slug}': {e}", exc_info=True)
@@ -654,26 +865,21 @@ class ColumnWidthUpdateView(views.APIView):
         return Response({"message": f"Widths updated for columns: {updated_col_ids}"}, status=status.HTTP_200_OK)
 
 
-class PageVersionListView(generics.ListAPIView):
-     """ API endpoint to list historical versions (snapshots) for a specific page. """
-     serializer_class = VersionSerializer       # Use the serializer defined for versions
-     permission_classes = [permissions.IsAuthenticated, CanViewPage] # Require VIEW permission on the page
-     # pagination_class = None                  # Disable pagination or use a specific pagination class if needed
-
-     def get_queryset(self):
-         """ Filter versions belonging to the specified page slug. """
-         page_slug = self.kwargs.get('page_slug')
-         # Fetch the page object first to check permissions and filter versions
-         # Use select_related('owner') if owner info is needed for permission check
-         page = get_object_or_404(Page.objects.select_related('owner'), slug=page_slug)
+    @action(detail=True, methods=['get'], url_path='versions', url_name='versions', pagination_class=VersionPagination)
+    def versions(self, request, slug=None):
+        """ List historical versions (snapshots) for this page, newest first. """
+        # get_object() looks the page up by slug and checks VIEW permission
+        page = self.get_object()
 
-         # Check if the current user has permission to view this page
-         self.check_object_permissions(self.request, page)
+        logger.debug(f"Listing versions for page '{page.slug}' for user '{request.user.email}'")
+        # Join the user and page so serializing user info and page_slug never queries per version
+        queryset = Version.objects.filter(page=page).select_related('user', 'page').order_by('-timestamp')
+        # Always paginated: VersionPagination has a fixed page_size, so at most max_page_size
+        # full snapshots are serialized per request
+        versions_page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(versions_page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-         logger.debug(f"Listing versions for page '{page_slug}' for user '{self.request.user.email}'")
-         # Fetch versions related to this page, ordered by timestamp descending (newest first)
-         # Select related user for efficiency when serializing user info
-         return Version.objects.filter(page=page).select_related('user').order_by('-timestamp')
 
 # --- Placeholder for Permission Management Views ---
 # These would handle CRUD for Groups, adding/removing users from Groups,
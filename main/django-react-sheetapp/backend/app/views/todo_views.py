@@ -1,19 +1,22 @@
 import logging
+import uuid
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 # --- Import IntegrityError ---
 from django.db import transaction, models, IntegrityError
+from django.db.models import Prefetch
 from rest_framework import viewsets, generics, status, permissions, views
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
 
 # Use relative imports within the app
-from ..models import Todo, TodoStatus, Page, Row, PagePermission
+from ..models import Todo, TodoStatus, Row, PagePermission
 from ..serializers import (
     TodoListSerializer, TodoDetailSerializer, TodoCreateSerializer,
-    TodoStatusSerializer, TodoStatusUpdateSerializer
+    TodoStatusUpdateSerializer
 )
-from ..permissions import IsCreatorOrAdminTodo, check_permission, CanViewPage # Use relative import
+from ..permissions import IsCreatorOrAdminTodo, CanViewPage, VIEW_LEVELS # Use relative import
 
 logger = logging.getLogger(__name__) # Use logger from settings
 
@@ -38,62 +41,76 @@ class TodoViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Todo.objects.none()
 
+        # Eager-load everything the serializers touch so responses use a fixed number of queries:
+        # creator and source page (+ its owner, embedded in the detail view) via JOINs,
+        # and on retrieve the statuses with their rows (row id/order) in one extra query.
+        base_qs = Todo.objects.select_related('creator', 'source_page', 'source_page__owner')
+        if self.action == 'retrieve':
+            base_qs = base_qs.prefetch_related(
+                Prefetch('statuses', queryset=TodoStatus.objects.select_related('row'))
+            )
+
         if user.is_superuser or user.is_staff:
             logger.debug(f"Admin/Staff user '{user.email}' fetching all ToDos.")
-            return Todo.objects.all().select_related('creator', 'source_page')
+            return base_qs
 
         logger.debug(f"Filtering ToDos for authenticated user: {user.email}")
-        # Get IDs of pages the user can view (using the permission helper)
-        # This can be optimized further if performance becomes an issue.
-        viewable_page_ids = [
-            page.id for page in Page.objects.select_related('owner').iterator()
-            if check_permission(user, page, PagePermission.Level.VIEW)
-        ]
-        # Alternative: Build complex Q object (might be faster for many pages/permissions)
-        # user_groups = user.member_of_groups.all()
-        # viewable_page_ids = Page.objects.filter(...).values_list('id', flat=True)
+        # Whether the user can view the ToDo's source page: same rules as check_permission (owner,
+        # public VIEW grant, or a direct/group grant at VIEW level or higher), evaluated by the
+        # database in the main query instead of one permission check per page in Python.
+        # The grants are an EXISTS subquery correlated on the source page, so the database stops at
+        # the first matching PagePermission and no join can duplicate ToDo rows (no distinct() needed).
+        view_grants = PagePermission.objects.filter(page_id=models.OuterRef('source_page_id')).filter(
+            models.Q(target_type=PagePermission.TargetType.PUBLIC,
+                     level=PagePermission.Level.VIEW) |
+            models.Q(target_type=PagePermission.TargetType.USER,
+                     target_user=user,
+                     level__in=VIEW_LEVELS) |
+            models.Q(target_type=PagePermission.TargetType.GROUP,
+                     target_group_id__in=user.groups_cached,
+                     level__in=VIEW_LEVELS)
+        )
 
         created_by_user_q = models.Q(creator=user)
-        viewable_non_personal_q = models.Q(is_personal=False, source_page_id__in=viewable_page_ids)
+        viewable_non_personal_q = models.Q(is_personal=False) & (
+            models.Q(source_page__owner=user) | models.Exists(view_grants)
+        )
 
-        return Todo.objects.filter(
+        return base_qs.filter(
             created_by_user_q | viewable_non_personal_q
-        ).distinct().select_related('creator', 'source_page').order_by('-created_at')
-
+        ).order_by('-created_at')
+
+
+    # Per-action serializer classes; anything else (list) uses TodoListSerializer.
+    # Add update/partial_update if allowing direct Todo metadata changes.
+    _serializer_classes = {
+        'retrieve': TodoDetailSerializer,
+        'create': TodoCreateSerializer,
+        'update_status': TodoStatusUpdateSerializer, # For the custom action
+    }
+
+    # Per-action permission classes. Modification, deletion and viewing require creator/admin
+    # or specific rights (IsCreatorOrAdminTodo checks this based on is_personal and source page
+    # view rights). Create and list only need authentication: permission to view the source
+    # page is checked in the serializer, and list filtering happens in get_queryset.
+    _permission_classes_by_action = {
+        'update': (permissions.IsAuthenticated, IsCreatorOrAdminTodo),
+        'partial_update': (permissions.IsAuthenticated, IsCreatorOrAdminTodo),
+        'destroy': (permissions.IsAuthenticated, IsCreatorOrAdminTodo),
+        'update_status': (permissions.IsAuthenticated, IsCreatorOrAdminTodo),
+        'retrieve': (permissions.IsAuthenticated, IsCreatorOrAdminTodo),
+    }
 
     def get_serializer_class(self):
         """ Return appropriate serializer based on the request action. """
-        if self.action == 'retrieve':
-            return TodoDetailSerializer
-        elif self.action == 'create':
-             return TodoCreateSerializer
-        elif self.action == 'update_status': # For the custom action
-             return TodoStatusUpdateSerializer
-        # Add update/partial_update if allowing direct Todo metadata changes
-        # elif self.action in ['update', 'partial_update']:
-        #    return SomeTodoUpdateSerializer
-        return TodoListSerializer # Default for list
+        return self._serializer_classes.get(self.action, TodoListSerializer)
 
     def get_permissions(self):
         """
         Instantiate and return the list of permissions that this view requires,
         based on the current action.
         """
-        base_perms = [permissions.IsAuthenticated]
-
-        if self.action in ['update', 'partial_update', 'destroy', 'update_status']:
-            # Requires creator/admin or specific rights for modification/deletion
-            # IsCreatorOrAdminTodo checks this based on is_personal and source page view rights
-            permission_classes = base_perms + [IsCreatorOrAdminTodo]
-        elif self.action == 'retrieve':
-             # Viewing also requires specific access rights checked by IsCreatorOrAdminTodo
-             permission_classes = base_perms + [IsCreatorOrAdminTodo]
-        elif self.action == 'create':
-             # Just need to be authenticated, permission to view source page checked in serializer
-             permission_classes = base_perms
-        else: # list action
-             permission_classes = base_perms # Filtering happens in get_queryset
-
+        permission_classes = self._permission_classes_by_action.get(self.action, (permissions.IsAuthenticated,))
         return [permission() for permission in permission_classes]
 
     @transaction.atomic # Ensure ToDo and initial statuses are created transactionally
@@ -165,50 +182,47 @@ class TodoViewSet(viewsets.ModelViewSet):
         Update the status for a specific row (identified by row_id) within this
         ToDo list (identified by pk).
         Expects PATCH request with payload: {"status": "NEW_STATUS"}
+        Responds with {"row_id": "...", "status": "NEW_STATUS"}.
         URL Example: /api/todos/{todo-uuid}/status/{row-uuid}/
         """
         todo = self.get_object() # Fetches ToDo instance using 'pk', checks object permissions
 
-        try:
-            # Find the specific TodoStatus entry for this ToDo and Row.
-            # Crucially, ensure the Row actually belongs to the ToDo's source Page.
-            status_instance = TodoStatus.objects.select_related('row').get(
-                todo=todo,
-                row_id=row_id, # Use the captured row_id from the URL
-                row__page=todo.source_page # Ensure row is linked to the correct page
-            )
-        except (TodoStatus.DoesNotExist, ValueError): # ValueError handles invalid UUID format for row_id
-             logger.warning(f"TodoStatus update requested for invalid row_id '{row_id}' or non-existent status on ToDo '{pk}'")
-             raise NotFound("Status entry not found for this row and ToDo list.")
-        except Exception as e:
-             # Catch unexpected errors during fetch
-             logger.error(f"Error fetching TodoStatus for ToDo {pk}, row {row_id}: {e}", exc_info=True)
-             # Return a generic server error response
-             return Response({"error": "Internal server error fetching status information."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        # Validate the incoming request data. The payload serializer needs no request context, so it is
+        # built directly rather than through get_serializer(), and errors are read from is_valid()
+        # instead of being raised and caught.
+        serializer = TodoStatusUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+             logger.warning(f"Invalid status update data for ToDo {pk}, row {row_id}: {serializer.errors}")
+             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        new_status = serializer.validated_data['status']
 
-        # Validate the incoming request data using the specified serializer
-        serializer = self.get_serializer(data=request.data)
         try:
-            serializer.is_valid(raise_exception=True) # Raise validation error if data is invalid
-        except ValidationError as e:
-             logger.warning(f"Invalid status update data for ToDo {pk}, row {row_id}: {e.detail}")
-             return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+            row_uuid = uuid.UUID(str(row_id))
+        except ValueError:
+            logger.warning(f"TodoStatus update requested for invalid row_id '{row_id}' on ToDo '{pk}'")
+            raise NotFound("Status entry not found for this row and ToDo list.")
+
+        # The status entry for this ToDo and Row. Crucially, ensure the Row actually belongs
+        # to the ToDo's source Page.
+        status_entries = TodoStatus.objects.filter(todo=todo, row_id=row_uuid, row__page_id=todo.source_page_id)
+        try:
+            # Compare and write in one conditional UPDATE; an unchanged status matches no row.
+            # update() bypasses auto_now, so updated_at is set explicitly.
+            updated = status_entries.exclude(status=new_status).update(status=new_status, updated_at=timezone.now())
+            # Nothing updated means either no change was needed or there is no such entry;
+            # only then is the extra existence check paid.
+            if not updated and not status_entries.exists():
+                logger.warning(f"TodoStatus update requested for non-existent status on ToDo '{pk}', row '{row_id}'")
+                raise NotFound("Status entry not found for this row and ToDo list.")
+        except NotFound:
+            raise
+        except Exception as e:
+             logger.error(f"Error saving updated status for ToDo {pk}, row {row_id}: {e}", exc_info=True)
+             return Response({"error": "Failed to save the status update."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        new_status = serializer.validated_data['status']
-        # Only perform DB update if the status is actually changing
-        if status_instance.status != new_status:
-            try:
-                status_instance.status = new_status
-                # Update only the 'status' field for efficiency
-                status_instance.save(update_fields=['status'])
-                logger.info(f"User {request.user.email} updated status for ToDo '{todo.name}', row {status_instance.row.order} (ID: {row_id}) to {new_status}")
-                # Return the updated TodoStatus object data on success
-                return Response(TodoStatusSerializer(status_instance).data, status=status.HTTP_200_OK)
-            except Exception as e:
-                 # Catch errors during the save operation
-                 logger.error(f"Error saving updated status for ToDo {pk}, row {row_id}: {e}", exc_info=True)
-                 return Response({"error": "Failed to save the status update."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if updated:
+            logger.info(f"User {request.user.email} updated status for ToDo '{todo.name}', row {row_id} to {new_status}")
         else:
-             # If status hasn't changed, just return the current status with 200 OK
-             logger.debug(f"Status update requested but no change needed for ToDo {pk}, row {row_id}. Current status: {new_status}")
-             return Response(TodoStatusSerializer(status_instance).data, status=status.HTTP_200_OK)
+            logger.debug(f"Status update requested but no change needed for ToDo {pk}, row {row_id}. Current status: {new_status}")
+        # The stored status now equals the validated one, so answer from the payload instead of re-reading the row
+        return Response({"row_id": str(row_uuid), "status": new_status}, status=status.HTTP_200_OK)
@@ -15,4 +15,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_config.settings')
 
 # Get the ASGI application handler.
+# Built at import time on purpose: a server that imports the app before forking workers
+# (e.g. gunicorn --preload with an ASGI worker class) then loads Django once and the workers
+# share those pages copy-on-write. Deferring this to the first request would repeat the
+# setup in every worker and make that request pay for it.
 application = get_asgi_application()
\ No newline at end of file
@@ -1,34 +1,76 @@
 import os
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from datetime import timedelta
 import logging.config
 
 # Base directory of the Django project (backend/)
-BASE_DIR = Path(__file__).resolve().parent.parent
+# abspath, not resolve(): no realpath/lstat walk, and symlinked checkouts keep their own path.
+# Derived paths below are built from the string form, with one Path object for BASE_DIR itself.
+_BASE_DIR_STR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_DIR = Path(_BASE_DIR_STR)
+
+
+def _load_env_file(path):
+    """
+    Minimal .env loader: KEY=VALUE lines, optional `export ` prefix, '#' comment lines,
+    inline ' #' comments after unquoted values, and single/double-quoted values.
+    Like python-dotenv's load_dotenv, variables already set in the environment win,
+    and a missing file is ignored.
+    """
+    try:
+        with open(path, 'rb') as f:
+            text = f.read().decode('utf-8')
+    except FileNotFoundError:
+        return
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('export '):
+            line = line[7:]
+        key, sep, value = line.partition('=')
+        if not sep:
+            continue
+        value = value.strip()
+        if value[:1] in ('"', "'") and value.count(value[0]) >= 2:
+            value = value[1:value.index(value[0], 1)] # Quoted: take everything up to the closing quote
+        else:
+            value = value.split(' #', 1)[0].rstrip() if not value.startswith('#') else ''
+        os.environ.setdefault(key.strip(), value)
+
 
 # Load environment variables from .env file located in the project root (django-react-sheetapp/)
-dotenv_path = BASE_DIR.parent / '.env'
-load_dotenv(dotenv_path=dotenv_path)
+dotenv_path = os.path.join(os.path.dirname(_BASE_DIR_STR), '.env')
+_load_env_file(dotenv_path)
+
+# Environment lookup bound once; every setting below reads the environment through it, once each
+_env = os.environ.get
 
 # --- Security Settings ---
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'default-insecure-key-for-dev-only') # Provide a fallback for safety
+SECRET_KEY = _env('DJANGO_SECRET_KEY') or 'default-insecure-key-for-dev-only' # Fallback also covers an empty DJANGO_SECRET_KEY=
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.environ.get('DEBUG', 'False') == 'True'
+DEBUG = _env('DEBUG', 'False') == 'True'
 
 # Hosts allowed to connect to this Django instance
 ALLOWED_HOSTS = ['localhost', '127.0.0.1', 'backend', '0.0.0.0'] # Allow Docker service name, localhost, any host for dev
 
 # --- Application Definition ---
-INSTALLED_APPS = [
+# Django admin (and the messages framework it depends on). On by default; API-only deployments
+# can set ENABLE_ADMIN=0 to skip loading admin, its autodiscovery and its middleware at startup.
+ADMIN_ENABLED = _env('ENABLE_ADMIN', '1') == '1'
+
+# Admin-only pieces, spliced in below when ADMIN_ENABLED
+_ADMIN_APPS = ('django.contrib.admin', 'django.contrib.messages') if ADMIN_ENABLED else ()
+_ADMIN_MIDDLEWARE = ('django.contrib.messages.middleware.MessageMiddleware',) if ADMIN_ENABLED else ()
+
+# Tuples: fixed at startup, nothing appends to them at runtime
+INSTALLED_APPS = _ADMIN_APPS + (
     # Django Core Apps
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
-    'django.contrib.messages',
     'django.contrib.staticfiles',
 
     # Third-party Apps
@@ -37,9 +79,9 @@ INSTALLED_APPS = [
 
     # Your Local Apps
     'app.apps.AppConfig', # Use AppConfig for clarity and potential setup (like signals)
-]
+)
 
-MIDDLEWARE = [
+MIDDLEWARE = (
     # CorsMiddleware should be placed high, especially before CommonMiddleware
     'corsheaders.middleware.CorsMiddleware',
     # Standard Django middleware
@@ -48,9 +90,9 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware', # Handles CSRF protection, crucial with session auth
     'django.contrib.auth.middleware.AuthenticationMiddleware', # Associates user with request
-    'django.contrib.messages.middleware.MessageMiddleware',
+) + _ADMIN_MIDDLEWARE + ( # MessageMiddleware after AuthenticationMiddleware, as in Django's default ordering
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-]
+)
 
 # Root URL configuration module
 ROOT_URLCONF = 'project_config.urls'
@@ -66,8 +108,7 @@ TEMPLATES = [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request', # Adds request object to template context
                 'django.contrib.auth.context_processors.auth', # Adds user object
-                'django.contrib.messages.context_processors.messages', # Adds messages framework
-            ],
+            ] + (['django.contrib.messages.context_processors.messages'] if ADMIN_ENABLED else []), # Adds messages framework
         },
     },
 ]
@@ -78,21 +119,40 @@ WSGI_APPLICATION = 'project_config.wsgi.application'
 
 # --- Database Configuration ---
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
+_DEFAULT_SQLITE_NAME = os.path.join(_BASE_DIR_STR, 'db.sqlite3') # Used when DB_NAME is unset
 DATABASES = {
     'default': {
-        'ENGINE': os.environ.get('DB_ENGINE', 'django.db.backends.sqlite3'), # Default to SQLite if not set
-        'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'), # Default to db.sqlite3 in backend/
-        'USER': os.environ.get('DB_USER'), # Read from .env
-        'PASSWORD': os.environ.get('DB_PASSWORD'), # Read from .env
-        'HOST': os.environ.get('DB_HOST'), # Read from .env (e.g., 'db' for docker service)
-        'PORT': os.environ.get('DB_PORT'), # Read from .env
+        'ENGINE': _env('DB_ENGINE', 'django.db.backends.sqlite3'), # Default to SQLite if not set
+        'NAME': _env('DB_NAME', _DEFAULT_SQLITE_NAME), # Default to db.sqlite3 in backend/
+        'USER': _env('DB_USER'), # Read from .env
+        'PASSWORD': _env('DB_PASSWORD'), # Read from .env
+        'HOST': _env('DB_HOST'), # Read from .env (e.g., 'db' for docker service)
+        'PORT': _env('DB_PORT'), # Read from .env
     }
 }
 # Validate required DB env vars if using PostgreSQL
-if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
-    if not all([DATABASES['default'].get(k) for k in ['NAME', 'USER', 'PASSWORD', 'HOST', 'PORT']]):
+_db = DATABASES['default']
+if _db['ENGINE'] == 'django.db.backends.postgresql':
+    # Stops at the first missing value and names it
+    _missing = next((k for k in ('NAME', 'USER', 'PASSWORD', 'HOST', 'PORT') if not _db[k]), None)
+    if _missing:
         # This check helps catch configuration errors early during startup
-        raise ValueError("Missing one or more required PostgreSQL environment variables (DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT)")
+        raise ValueError(f"Missing required PostgreSQL environment variable DB_{_missing} (DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT are all required)")
+
+
+# --- Cache Configuration ---
+# https://docs.djangoproject.com/en/4.2/ref/settings/#caches
+# The page-list cache and its invalidation version (app.signals) must be shared by every
+# worker process, so deployments with more than one process set REDIS_URL. Without it each
+# process gets its own in-memory cache, which is only correct for single-process dev servers.
+_REDIS_URL = _env('REDIS_URL')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': _REDIS_URL,
+    } if _REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
 
 
 # --- Password Validation ---
@@ -107,6 +167,18 @@ AUTH_PASSWORD_VALIDATORS = [
 # Custom User Model
 AUTH_USER_MODEL = 'app.User' # Point to your custom User model in the 'app' application
 
+# Email/password login; equalizes unknown-user timing against a cached dummy hash
+AUTHENTICATION_BACKENDS = ['app.backends.EmailBackend']
+
+# --- Test Run Settings ---
+# True when running the test suite via `manage.py test` or pytest
+TESTING = (len(sys.argv) > 1 and sys.argv[1] == 'test') or 'pytest' in sys.modules
+if TESTING:
+    # PBKDF2 hashing dominates test fixture setup and tests never rely on its strength
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    # Tests clear the cache between cases; never point that at a shared Redis
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
 # --- Internationalization ---
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
 LANGUAGE_CODE = 'en-us'
@@ -150,7 +222,12 @@ REST_FRAMEWORK = {
 # --- CORS (Cross-Origin Resource Sharing) Settings ---
 # https://github.com/adamchainz/django-cors-headers
 # Allow requests from the frontend development server origin
-CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
+# Parsed once into a tuple, so it can be shared with CSRF_TRUSTED_ORIGINS below without aliasing a mutable list
+# Surrounding whitespace and empty entries are dropped and duplicates removed (first occurrence wins),
+# so 'http://a, http://b,' and repeated origins don't produce entries that never match.
+CORS_ALLOWED_ORIGINS = tuple(dict.fromkeys(
+    origin.strip() for origin in _env('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',') if origin.strip()
+))
 # Allow cookies (like sessionid and csrftoken) to be sent in cross-origin requests
 CORS_ALLOW_CREDENTIALS = True
 
@@ -172,9 +249,11 @@ SESSION_COOKIE_SECURE = not DEBUG
 # --- Logging Configuration ---
 # https://docs.djangoproject.com/en/4.2/topics/logging/
 LOGGING_CONFIG = None # Disable default config to use dictConfig below
-LOGLEVEL = os.environ.get('LOGLEVEL', 'info').upper() # Control log level via environment variable
+LOGLEVEL = _env('LOGLEVEL', 'info').upper() # Control log level via environment variable
+# Log DEBUG level messages and higher only when DEBUG=True
+_CONSOLE_LEVEL = 'DEBUG' if DEBUG else LOGLEVEL
 
-logging.config.dictConfig({
+_LOGGING = {
     'version': 1,
     'disable_existing_loggers': False, # Keep default loggers active unless explicitly overridden
     'formatters': {
@@ -188,8 +267,7 @@ logging.config.dictConfig({
     },
     'handlers': {
         'console': {
-            # Log DEBUG level messages and higher only when DEBUG=True
-            'level': 'DEBUG' if DEBUG else LOGLEVEL,
+            'level': _CONSOLE_LEVEL,
             'class': 'logging.StreamHandler', # Output logs to stderr/stdout
             'formatter': 'simple' # Use the simple log format
         },
@@ -241,4 +319,8 @@ logging.config.dictConfig({
     #     'handlers': ['console'],
     #     'level': 'WARNING',
     # },
-})
\ No newline at end of file
+}
+
+# DJANGO_LOG_SKIP=1 leaves Python's default logging untouched (one-shot scripts, quiet runs)
+if not _env('DJANGO_LOG_SKIP'):
+    logging.config.dictConfig(_LOGGING)
\ No newline at end of file
@@ -14,17 +14,19 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include # Import include
 
 urlpatterns = [
-    # Django Admin site URLs
-    path('admin/', admin.site.urls),
-
     # Include URLs from your application ('app') under the '/api/' prefix
     # All URLs defined in app/urls.py will be accessible via /api/...
     path('api/', include('app.urls')),
 
     # Add other top-level URL patterns here if needed
     # e.g., path('accounts/', include('django.contrib.auth.urls')), # If using Django's built-in auth views/templates
-]
\ No newline at end of file
+]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+    # Django Admin site URLs
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
@@ -11,9 +11,15 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/wsgi/
 import os
 
 from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
 
 # Set the default Django settings module for the 'wsgi' application.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_config.settings')
 
 # Get the WSGI application handler.
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# Import the URLconf (and with it the views, serializers and DRF) now instead of on the first
+# request. Under gunicorn --preload this happens once in the master and workers inherit it
+# copy-on-write; without preload each worker pays it at boot rather than in a user's request.
+get_resolver().url_patterns
\ No newline at end of file
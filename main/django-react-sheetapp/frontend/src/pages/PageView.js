@@ -126,6 +126,8 @@ function PageView() {
                       order: row.order,
                       cells: row.cells,
                  })),
+                 // Revision the edits were based on; the backend answers 409 if it is stale
+                 base_revision: pageData?.revision,
                  // commit_message: "Frontend Save" // Optional
             };
             await api.savePageData(pageSlug, payload);
@@ -154,7 +156,7 @@ function PageView() {
               if (isMounted.current) updateIsLoadingSave(false); // Update context state
          }
     // Dependencies: Include all external variables/state/functions used inside
-    }, [isEditing, editData, pageSlug, fetchData, updateIsEditing, updateIsLoadingSave, addNotification]);
+    }, [isEditing, editData, pageData, pageSlug, fetchData, updateIsEditing, updateIsLoadingSave, addNotification]);
 
 
     const handleToggleEdit = useCallback(() => {